@@ -6,9 +6,15 @@
 
 import os, sys
 import time
+import random
+import calendar
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+import profiling
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -17,54 +23,239 @@ CLIENT_ID = os.getenv('CLIENT_ID')
 CLIENT_SECRET = os.getenv('CLIENT_SECRET')
 TOKEN_URL = 'https://id.twitch.tv/oauth2/token'
 IGDB_BASE_URL = 'https://api.igdb.com/v4'
+COVER_IMAGE_URL = 'https://images.igdb.com/igdb/image/upload/t_cover_big/{}.jpg'
 
-# Check if CLIENT_ID and CLIENT_SECRET are defined
-if not CLIENT_ID and not CLIENT_SECRET:
-    print('Error: Both the client ID and client secret are missing. Please add them to your .env file.')
-    sys.exit()
-elif not CLIENT_ID:
-    print('Error: The client ID is missing. Please add it to your .env file.')
-    sys.exit()
-elif not CLIENT_SECRET:
-    print('Error: The client secret is missing. Please add it to your .env file.')
-    sys.exit()
-
-# Get a new access token
-params = {
-    'client_id': CLIENT_ID,
-    'client_secret': CLIENT_SECRET,
-    'grant_type': 'client_credentials'
-}
-
-try:
-    response = requests.post(TOKEN_URL, params=params)
-    if response.status_code == 200:
-        ACCESS_TOKEN = response.json().get('access_token')
-    else:
-        try:
-            error_info = response.json()
-            error_message = error_info.get('message', '')
-            if response.status_code == 400 and 'invalid client' in error_message:
-                print('Error: Your client ID is invalid or both the client ID and client secret are incorrect. Please correct them in your .env file.')
-            elif response.status_code == 403 and 'invalid client secret' in error_message:
-                print('Error: Your client secret is invalid. Please correct it in your .env file.')
-            else:
-                print(f"Unexpected error: {error_message}")
-        except ValueError:
-            print('Error: The server response was not in JSON format.')
-            print(f"Response: {response.text}")
-        print('Program terminating due to error.')
+# Shared search service (see search_service.py). When IGDB_SERVICE_URL is set,
+# every request goes through that service instead, which holds the token,
+# cache and rate limit for all of its clients.
+SERVICE_URL = (os.getenv('IGDB_SERVICE_URL') or '').rstrip('/') or None
+# Sent to the shared service with queries whose response won't be asked for
+# again (random id probes), so it doesn't keep them in its cache.
+NO_CACHE_HEADER = 'X-IGDB-No-Cache'
+# Shared secret for the service. When IGDB_SERVICE_TOKEN is set, the service
+# only answers requests that carry it, and clients send it with every request.
+SERVICE_TOKEN = os.getenv('IGDB_SERVICE_TOKEN') or None
+SERVICE_TOKEN_HEADER = 'X-IGDB-Service-Token'
+
+# IGDB allows 4 requests per second and 8 open requests per client.
+REQUESTS_PER_SECOND = 4
+MAX_CONCURRENT_REQUESTS = 8
+MAX_RETRIES = 3
+
+
+def fetch_access_token():
+    """
+    Get a new access token using CLIENT_ID and CLIENT_SECRET.
+    Exits the program with a message if the credentials are missing or wrong.
+    """
+    # Check if CLIENT_ID and CLIENT_SECRET are defined
+    if not CLIENT_ID and not CLIENT_SECRET:
+        print('Error: Both the client ID and client secret are missing. Please add them to your .env file.')
+        sys.exit()
+    elif not CLIENT_ID:
+        print('Error: The client ID is missing. Please add it to your .env file.')
+        sys.exit()
+    elif not CLIENT_SECRET:
+        print('Error: The client secret is missing. Please add it to your .env file.')
         sys.exit()
-except requests.exceptions.RequestException as e:
-    print(f"Network error occurred: {e}")
-    print('Please check your internet connection or API endpoint URL.')
-    sys.exit()
 
-# Authorization header for API calls
-HEADERS = {
-    'Client-ID': CLIENT_ID,
-    'Authorization': f'Bearer {ACCESS_TOKEN}'
-}
+    # Get a new access token
+    params = {
+        'client_id': CLIENT_ID,
+        'client_secret': CLIENT_SECRET,
+        'grant_type': 'client_credentials'
+    }
+
+    try:
+        response = requests.post(TOKEN_URL, params=params)
+        if response.status_code == 200:
+            return response.json().get('access_token')
+        else:
+            try:
+                error_info = response.json()
+                error_message = error_info.get('message', '')
+                if response.status_code == 400 and 'invalid client' in error_message:
+                    print('Error: Your client ID is invalid or both the client ID and client secret are incorrect. Please correct them in your .env file.')
+                elif response.status_code == 403 and 'invalid client secret' in error_message:
+                    print('Error: Your client secret is invalid. Please correct it in your .env file.')
+                else:
+                    print(f"Unexpected error: {error_message}")
+            except ValueError:
+                print('Error: The server response was not in JSON format.')
+                print(f"Response: {response.text}")
+            print('Program terminating due to error.')
+            sys.exit()
+    except requests.exceptions.RequestException as e:
+        print(f"Network error occurred: {e}")
+        print('Please check your internet connection or API endpoint URL.')
+        sys.exit()
+
+
+if SERVICE_URL:
+    IGDB_BASE_URL = f"{SERVICE_URL}/v4"
+    HEADERS = {SERVICE_TOKEN_HEADER: SERVICE_TOKEN} if SERVICE_TOKEN else {}
+else:
+    ACCESS_TOKEN = fetch_access_token()
+
+    # Authorization header for API calls
+    HEADERS = {
+        'Client-ID': CLIENT_ID,
+        'Authorization': f'Bearer {ACCESS_TOKEN}'
+    }
+
+
+class RateLimiter:
+    """
+    Spaces requests out to at most `rate` per second, with at most
+    `concurrency` in flight at once. Used as a context manager around each
+    request; shared by every thread in the process.
+    """
+
+    def __init__(self, rate, concurrency):
+        self.interval = 1.0 / rate
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._slots.release()
+
+
+# One pooled session and limiter for the whole process. Clients of the shared
+# service leave rate limiting to the service.
+SESSION = requests.Session()
+SESSION.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=MAX_CONCURRENT_REQUESTS))
+SESSION.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=MAX_CONCURRENT_REQUESTS))
+RATE_LIMITER = None if SERVICE_URL else RateLimiter(REQUESTS_PER_SECOND, MAX_CONCURRENT_REQUESTS)
+
+
+def post_igdb(endpoint, body, timeout=30, cacheable=True):
+    """
+    Send one Apicalypse query to an IGDB endpoint (or the shared service).
+    All requests go through here so they share the connection pool and the
+    rate limit; 429 responses are retried with backoff. With cacheable=False
+    the shared service is told not to cache the response.
+    """
+    url = f"{IGDB_BASE_URL}/{endpoint}"
+    headers = HEADERS
+    if SERVICE_URL and not cacheable:
+        headers = {**HEADERS, NO_CACHE_HEADER: '1'}
+    for attempt in range(MAX_RETRIES + 1):
+        if RATE_LIMITER is not None:
+            with RATE_LIMITER:
+                response = SESSION.post(url, headers=headers, data=body, timeout=timeout)
+        else:
+            response = SESSION.post(url, headers=headers, data=body, timeout=timeout)
+        if response.status_code == 401 and not SERVICE_URL and attempt == 0:
+            # Tokens expire (long-running services outlive them); get a new one once.
+            HEADERS['Authorization'] = f'Bearer {fetch_access_token()}'
+            continue
+        if response.status_code != 429 or attempt == MAX_RETRIES:
+            return response
+        time.sleep(0.5 * 2 ** attempt)
+
+
+# -----------------------
+# Query Building
+# -----------------------
+
+def escape_string(text):
+    """Escape a value for use inside a double-quoted Apicalypse string."""
+    return str(text).replace('\\', '\\\\').replace('"', '\\"')
+
+
+class Query:
+    """
+    Builder for Apicalypse query strings, so callers don't assemble them by
+    hand. Every method returns the query itself, so calls can be chained:
+
+        Query("name, rating").expand("cover", "image_id").search("zelda")
+            .where("rating > 80").sort("rating", "desc").limit(50).build()
+    """
+
+    def __init__(self, *fields):
+        self._fields = []
+        self._search = None
+        self._where = []
+        self._sort = None
+        self._limit = None
+        self._offset = None
+        self.fields(*fields)
+
+    def fields(self, *fields):
+        """Add fields to the projection. Accepts names or comma-separated strings."""
+        for field in fields:
+            for name in str(field).split(','):
+                name = name.strip()
+                if name and name not in self._fields:
+                    self._fields.append(name)
+        return self
+
+    def expand(self, relation, *subfields):
+        """Expand a relation, e.g. expand("cover", "image_id") -> cover.image_id."""
+        return self.fields(*(f"{relation}.{subfield}" for subfield in (subfields or ("*",))))
+
+    def search(self, text):
+        self._search = text
+        return self
+
+    def where(self, condition):
+        """Add a raw filter condition; multiple conditions are and-ed together."""
+        if condition:
+            self._where.append(f"({condition})" if '|' in condition else condition)
+        return self
+
+    def where_in(self, field, values):
+        """Match field against any of values, e.g. `id = (1,2,3)`."""
+        return self.where(f"{field} = ({','.join(str(value) for value in values)})")
+
+    def sort(self, field, direction="asc"):
+        self._sort = f"{field} {direction}"
+        return self
+
+    def limit(self, limit):
+        self._limit = limit
+        return self
+
+    def offset(self, offset):
+        self._offset = offset
+        return self
+
+    def copy(self):
+        query = Query(*self._fields)
+        query._search = self._search
+        query._where = list(self._where)
+        query._sort = self._sort
+        query._limit = self._limit
+        query._offset = self._offset
+        return query
+
+    def build(self):
+        parts = [f"fields {', '.join(self._fields) or '*'};"]
+        if self._search is not None:
+            parts.append(f'search "{escape_string(self._search)}";')
+        if self._where:
+            parts.append(f"where {' & '.join(self._where)};")
+        if self._sort:
+            parts.append(f"sort {self._sort};")
+        if self._limit is not None:
+            parts.append(f"limit {self._limit};")
+        if self._offset is not None:
+            parts.append(f"offset {self._offset};")
+        return ' '.join(parts)
+
+    def __str__(self):
+        return self.build()
 
 
 # -----------------------
@@ -75,34 +266,101 @@ def fetch_data(endpoint, fields, limit=500, offset=0):
     """
     Fetch data from a given IGDB endpoint.
     """
-    query = f"fields {fields}; limit {limit}; offset {offset};"
-    response = requests.post(f"{IGDB_BASE_URL}/{endpoint}", headers=HEADERS, data=query)
+    query = Query(fields).limit(limit).offset(offset)
+    with profiling.span("api.http", endpoint=endpoint, query=query.build()):
+        response = post_igdb(endpoint, query.build())
     if response.status_code == 200:
-        return response.json()
+        with profiling.span("api.json_decode", endpoint=endpoint):
+            return response.json()
     else:
         print(f"Error fetching data from {endpoint}: {response.status_code} - {response.text}")
         return []
 
 
-def get_game_data(query, endpoint="games"):
+class IGDBRequestError(Exception):
+    """An IGDB request that failed (non-200 after retries)."""
+
+
+def get_game_data(query, endpoint="games", cacheable=True, raise_errors=False):
     """
-    Fetch game data from the IGDB API using a custom query.
+    Fetch game data from the IGDB API using a custom query (a Query or a
+    raw Apicalypse string). A failed request returns [] unless raise_errors
+    is set, in which case it raises IGDBRequestError; paginating callers
+    need that to tell a failure from the end of the results.
     """
-    url = f"{IGDB_BASE_URL}/{endpoint}"
-    response = requests.post(url, headers=HEADERS, data=query)
+    with profiling.span("api.http", endpoint=endpoint, query=str(query)):
+        response = post_igdb(endpoint, str(query), cacheable=cacheable)
     if response.status_code == 200:
-        return response.json()
+        with profiling.span("api.json_decode", endpoint=endpoint):
+            return response.json()
+    elif raise_errors:
+        raise IGDBRequestError(f"IGDB request to {endpoint} failed: {response.status_code} - {response.text}")
     else:
         print(f"Error: {response.status_code}, {response.text}")
         return []
-    
+
+
+def iter_query_pages(query, endpoint="games", page_size=500, prefetch=1, max_results=None):
+    """
+    Lazily run a Query page by page, yielding each page (a list of records).
+
+    While the caller works on one page, up to `prefetch` following pages are
+    already being requested in the background. Iteration stops at the first
+    short page, or once max_results records have been yielded. A failed
+    request raises IGDBRequestError rather than ending the results early.
+    """
+    start = query._offset or 0
+
+    def page_query(page_number):
+        page_offset = start + page_number * page_size
+        page_limit = page_size
+        if max_results is not None:
+            page_limit = min(page_size, max_results - page_number * page_size)
+        return query.copy().limit(page_limit).offset(page_offset).build()
+
+    total_pages = None
+    if max_results is not None:
+        total_pages = -(-max_results // page_size)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, prefetch))
+    pending = []
+    next_page = 0
+    try:
+        while True:
+            # Keep the current page plus `prefetch` more in flight.
+            while len(pending) <= prefetch and (total_pages is None or next_page < total_pages):
+                pending.append(executor.submit(profiling.bind(get_game_data), page_query(next_page), endpoint,
+                                               raise_errors=True))
+                next_page += 1
+            if not pending:
+                return
+            page = pending.pop(0).result()
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def iter_query(query, endpoint="games", page_size=500, prefetch=1, max_results=None):
+    """
+    Lazily stream the records of a Query, one at a time. See iter_query_pages.
+    """
+    for page in iter_query_pages(query, endpoint, page_size, prefetch, max_results):
+        yield from page
+
+
 def get_games_count():
     """
     Returns the total number of games in the IGDB database.
     This function calls the /games/count endpoint with an empty query.
     """
     try:
-        response = requests.post(f"{IGDB_BASE_URL}/games/count", headers=HEADERS, data="", timeout=10)
+        with profiling.span("api.http", endpoint="games/count"):
+            response = post_igdb("games/count", "", timeout=10)
         if response.status_code == 200:
             return response.json().get("count", 0)
         else:
@@ -121,11 +379,8 @@ def fetch_cover_image(cover_id):
     if not cover_id:
         return "No cover available"
     
-    response = requests.post(
-        f"{IGDB_BASE_URL}/covers",
-        headers=HEADERS,
-        data=f'fields image_id; where id = {cover_id};'
-    )
+    with profiling.span("api.http", endpoint="covers", cover_id=cover_id):
+        response = post_igdb("covers", Query("image_id").where(f"id = {cover_id}").build())
     if response.status_code == 200:
         cover_data = response.json()
         if cover_data and 'image_id' in cover_data[0]:
@@ -167,6 +422,159 @@ def format_unix_timestamp(timestamp):
     return time.strftime('%d-%m-%Y', time.gmtime(timestamp))
 
 
+def cover_image_url(image_id):
+    """
+    Build the cover URL directly from an expanded cover.image_id, avoiding
+    the extra /covers request made by fetch_cover_image.
+    """
+    if not image_id:
+        return "No cover available"
+    return COVER_IMAGE_URL.format(image_id)
+
+
+def fetch_cover_urls(cover_ids, batch_size=500):
+    """
+    Batched version of fetch_cover_image. Returns {cover_id: url} for every
+    cover that was found, using one /covers request per batch_size ids.
+    """
+    cover_ids = list(cover_ids)
+    urls = {}
+    for start in range(0, len(cover_ids), batch_size):
+        batch = cover_ids[start:start + batch_size]
+        query = Query("image_id").where_in("id", batch).limit(len(batch))
+        for cover in get_game_data(query, endpoint="covers"):
+            urls[cover['id']] = cover_image_url(cover.get('image_id'))
+    return urls
+
+
+# -----------------------
+# Id-based Fetching and Random Sampling
+# -----------------------
+
+# Highest game id seen in IGDB, cached so random draws don't need a count
+# request (or a deep offset) each time.
+_max_game_id = None
+
+
+def get_max_game_id(refresh=False):
+    """
+    Returns the highest game id in the IGDB database. The value is cached
+    after the first call; pass refresh=True to look it up again.
+    """
+    global _max_game_id
+    if _max_game_id is None or refresh:
+        game_data = get_game_data(Query("id").sort("id", "desc").limit(1))
+        _max_game_id = game_data[0].get('id', 0) if game_data else 0
+    return _max_game_id
+
+
+def fetch_games_by_ids(game_ids, fields, extra_where="", batch_size=500, cacheable=True):
+    """
+    Fetch games for a list of ids using `where id = (...)` queries of up to
+    batch_size ids each. extra_where is and-ed onto every batch.
+    Ids that don't exist (or don't match extra_where) are simply missing
+    from the result.
+    """
+    results = []
+    for games in iter_games_by_ids(game_ids, fields, extra_where, batch_size, prefetch=0, cacheable=cacheable):
+        results.extend(games)
+    return results
+
+
+def iter_games_by_ids(game_ids, fields, extra_where="", batch_size=500, prefetch=1, cacheable=True):
+    """
+    Lazily fetch games for a list of ids, yielding the games of each batch of
+    batch_size ids (one `where id = (...)` request each, possibly fewer games
+    than ids). Up to `prefetch` following batches are requested in the
+    background while the caller works on the current one. A failed request
+    raises IGDBRequestError.
+    """
+    game_ids = list(game_ids)
+    batches = [game_ids[start:start + batch_size] for start in range(0, len(game_ids), batch_size)]
+    queries = [Query(fields).where_in("id", batch).where(extra_where).limit(len(batch)) for batch in batches]
+    if prefetch <= 0:
+        for query in queries:
+            yield get_game_data(query, cacheable=cacheable, raise_errors=True)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=prefetch)
+    pending = []
+    try:
+        for query in queries:
+            pending.append(executor.submit(profiling.bind(get_game_data), query, cacheable=cacheable,
+                                           raise_errors=True))
+            if len(pending) > prefetch:
+                yield pending.pop(0).result()
+        while pending:
+            yield pending.pop(0).result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def draw_random_games(count, fields, genre_id=None, platform_id=None, max_attempts=20,
+                      year_range=None, min_rating=None):
+    """
+    Draw up to `count` distinct random games without using offsets.
+
+    Each attempt samples a batch of untried ids from 1..get_max_game_id() and
+    probes all of them in one `where id = (...)` request that only returns
+    the ids. Ids that fall in gaps (deleted games) or don't match the
+    optional filters are dropped and the draw retries with fresh ids until
+    enough games were found or max_attempts requests have been made. Full
+    `fields` are then fetched only for the games actually drawn.
+
+    year_range is an inclusive (first_year, last_year) tuple of release
+    years; either end may be None.
+    """
+    max_id = get_max_game_id()
+    if max_id <= 0 or count <= 0:
+        return []
+
+    filters = []
+    if genre_id is not None:
+        filters.append(f"genres = ({genre_id})")
+    if platform_id is not None:
+        filters.append(f"platforms = ({platform_id})")
+    if year_range and year_range[0] is not None:
+        filters.append(f"first_release_date >= {calendar.timegm((year_range[0], 1, 1, 0, 0, 0))}")
+    if year_range and year_range[1] is not None:
+        filters.append(f"first_release_date < {calendar.timegm((year_range[1] + 1, 1, 1, 0, 0, 0))}")
+    if min_rating is not None:
+        filters.append(f"rating >= {min_rating}")
+    extra_where = " & ".join(filters)
+
+    found_ids = []
+    tried_ids = set()
+    for _ in range(max_attempts):
+        remaining_ids = max_id - len(tried_ids)
+        if remaining_ids <= 0:
+            break
+        # One request can hold up to 500 ids, so always fill it; the spare
+        # candidates absorb gaps and filter misses.
+        sample_size = min(500, remaining_ids)
+        if sample_size == remaining_ids:
+            candidates = set(range(1, max_id + 1)) - tried_ids
+        else:
+            candidates = set()
+        while len(candidates) < sample_size:
+            candidate = random.randint(1, max_id)
+            if candidate not in tried_ids:
+                candidates.add(candidate)
+        tried_ids.update(candidates)
+
+        # Random probes are never repeated, so the shared service needn't cache them.
+        hits = [game['id'] for game in fetch_games_by_ids(candidates, "id", extra_where, cacheable=False)]
+        random.shuffle(hits)
+        found_ids.extend(hits[:count - len(found_ids)])
+        if len(found_ids) >= count:
+            break
+
+    games_by_id = {game['id']: game for game in fetch_games_by_ids(found_ids, fields, cacheable=False)}
+    return [games_by_id[game_id] for game_id in found_ids if game_id in games_by_id]
+
+
 # Create global maps that can be imported and used by other modules
 GENRE_MAP = create_genre_map()
 PLATFORM_MAP = create_platform_map()
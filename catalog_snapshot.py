@@ -0,0 +1,222 @@
+# This file is the catalog_snapshot module for the IGDB Game Searcher application.
+# It saves the harvested games table as a columnar snapshot of fixed-width
+# numpy arrays (id, release date, rating, genre bitmask, plus lowercased names
+# for title matching). The arrays are memory-mapped when opened, so filtering
+# and random picks only page in the columns they touch instead of loading
+# the whole catalog into RAM.
+
+# Author: Nelson McFadyen
+# Last Updated: October 18, 2026
+
+import os
+import json
+import mmap
+import shutil
+import calendar
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_DIR = os.getenv(
+    'IGDB_SNAPSHOT_DIR',
+    os.path.join(os.path.expanduser('~'), '.igdb_game_searcher', 'snapshot')
+)
+
+# Rows are filtered this many at a time, to bound temporary memory.
+CHUNK_SIZE = 1_000_000
+
+ARRAY_FILES = {
+    "ids": "ids.npy",                    # int64 IGDB game id
+    "release_dates": "release_dates.npy",  # int64 unix seconds, 0 = unknown
+    "ratings": "ratings.npy",            # float32, NaN = unknown
+    "genre_masks": "genre_masks.npy",    # uint64, one bit per genre (see meta.json)
+    "name_offsets": "name_offsets.npy",  # int64, start of each name in names.bin
+}
+NAMES_FILE = "names.bin"  # lowercased names, each followed by a newline
+META_FILE = "meta.json"
+
+
+def genre_mask(genre_ids, genre_bits):
+    mask = 0
+    for genre_id in genre_ids:
+        bit = genre_bits.get(genre_id)
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+
+def columns_from_results(games, genre_map):
+    """
+    Build snapshot columns from result rows as shown by the search window
+    ("ID", "Name", "Release Date" as dd-mm-YYYY, "Rating", "Genres" as names).
+    Returns (columns, names, genre_bits).
+    """
+    frame = pd.DataFrame.from_records(games, columns=["ID", "Name", "Release Date", "Rating", "Genres"])
+    frame = frame.dropna(subset=["ID"]).drop_duplicates(subset="ID", keep="last")
+
+    # Bits are assigned in genre id order; 64 bits is plenty for IGDB's genres.
+    genre_bits = {genre_id: bit for bit, genre_id in enumerate(sorted(genre_map)[:64])}
+    ids_by_name = {name: genre_id for genre_id, name in genre_map.items()}
+    masks = frame["Genres"].fillna("").map(
+        lambda names: genre_mask((ids_by_name.get(name) for name in str(names).split(", ")), genre_bits)
+    )
+    dates = pd.to_datetime(frame["Release Date"], format="%d-%m-%Y", errors="coerce", utc=True)
+    columns = {
+        "ids": frame["ID"].astype("int64").to_numpy(),
+        "release_dates": ((dates - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).fillna(0).astype("int64").to_numpy(),
+        "ratings": pd.to_numeric(frame["Rating"], errors="coerce").astype("float32").to_numpy(),
+        "genre_masks": masks.astype("uint64").to_numpy(),
+    }
+    names = frame["Name"].fillna("").astype(str).tolist()
+    return columns, names, genre_bits
+
+
+def write_snapshot(columns, names, genre_bits, directory=SNAPSHOT_DIR):
+    """
+    Write a snapshot directory. Files are written to a temporary directory
+    first and swapped in at the end, so readers never see a half-written one.
+    """
+    encoded = [name.lower().replace("\n", " ").encode("utf-8") + b"\n" for name in names]
+    offsets = np.zeros(len(encoded) + 1, dtype="int64")
+    np.cumsum([len(name) for name in encoded], out=offsets[1:])
+
+    temp_dir = directory.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+    for key, file_name in ARRAY_FILES.items():
+        array = offsets if key == "name_offsets" else columns[key]
+        np.save(os.path.join(temp_dir, file_name), array)
+    with open(os.path.join(temp_dir, NAMES_FILE), "wb") as f:
+        f.writelines(encoded)
+    with open(os.path.join(temp_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"count": len(names), "genre_bits": {str(k): v for k, v in genre_bits.items()}}, f)
+
+    old_dir = directory.rstrip(os.sep) + ".old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(directory):
+        os.replace(directory, old_dir)
+    os.replace(temp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def save_results(games, genre_map, directory=SNAPSHOT_DIR):
+    """
+    Add result rows to the snapshot in `directory`, merging with what is
+    already there (newer rows win for the same id). Returns the new row count.
+    """
+    columns, names, genre_bits = columns_from_results(games, genre_map)
+    existing = CatalogSnapshot.open(directory)
+    if existing is not None and len(existing):
+        old = existing.load_all(genre_bits)
+        keep = ~np.isin(old[0]["ids"], columns["ids"])
+        columns = {key: np.concatenate([old[0][key][keep], columns[key]]) for key in columns}
+        names = [name for name, kept in zip(old[1], keep) if kept] + names
+        existing.close()
+    write_snapshot(columns, names, genre_bits, directory)
+    return len(names)
+
+
+class CatalogSnapshot:
+    """A memory-mapped snapshot opened for filtering and random picks."""
+
+    def __init__(self, directory=SNAPSHOT_DIR):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.genre_bits = {int(k): v for k, v in meta["genre_bits"].items()}
+        self.arrays = {
+            key: np.load(os.path.join(directory, file_name), mmap_mode="r")
+            for key, file_name in ARRAY_FILES.items()
+        }
+        # Names are searched in place in the mapped file, never copied whole.
+        names_path = os.path.join(directory, NAMES_FILE)
+        self.names = b""
+        if os.path.getsize(names_path):
+            with open(names_path, "rb") as f:
+                self.names = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def open(cls, directory=SNAPSHOT_DIR):
+        """Returns the snapshot in directory, or None if there isn't one."""
+        if not os.path.exists(os.path.join(directory, META_FILE)):
+            return None
+        return cls(directory)
+
+    def __len__(self):
+        return len(self.arrays["ids"])
+
+    def close(self):
+        self.arrays = {}
+        if isinstance(self.names, mmap.mmap):
+            self.names.close()
+        self.names = b""
+
+    def name_rows(self, text):
+        """Rows whose (lowercased) name contains text."""
+        needle = text.lower().encode("utf-8")
+        positions = []
+        position = self.names.find(needle)
+        while position != -1:
+            positions.append(position)
+            position = self.names.find(needle, position + 1)
+        rows = np.searchsorted(self.arrays["name_offsets"], positions, side="right") - 1
+        return np.unique(rows)
+
+    def matching_rows(self, genre_ids=None, year_range=None, min_rating=None, name=None):
+        """
+        Row indices matching every given filter: any of genre_ids, release
+        year within year_range (inclusive, either end may be None), rating >= min_rating and name
+        containing `name`. Columns are scanned in chunks over the mmap.
+        """
+        wanted_mask = np.uint64(genre_mask(genre_ids or [], self.genre_bits))
+        first_year, last_year = year_range or (None, None)
+        candidate_rows = self.name_rows(name) if name else None
+
+        matches = []
+        for chunk_start in range(0, len(self), CHUNK_SIZE):
+            chunk = slice(chunk_start, chunk_start + CHUNK_SIZE)
+            keep = np.ones(min(CHUNK_SIZE, len(self) - chunk_start), dtype=bool)
+            if genre_ids:
+                keep &= (self.arrays["genre_masks"][chunk] & wanted_mask) != 0
+            if first_year is not None or last_year is not None:
+                dates = self.arrays["release_dates"][chunk]
+                keep &= dates != 0
+                if first_year is not None:
+                    keep &= dates >= calendar.timegm((first_year, 1, 1, 0, 0, 0))
+                if last_year is not None:
+                    keep &= dates < calendar.timegm((last_year + 1, 1, 1, 0, 0, 0))
+            if min_rating is not None:
+                keep &= self.arrays["ratings"][chunk] >= min_rating
+            matches.append(np.flatnonzero(keep) + chunk_start)
+        rows = np.concatenate(matches) if matches else np.zeros(0, dtype="int64")
+        if candidate_rows is not None:
+            rows = np.intersect1d(rows, candidate_rows, assume_unique=True)
+        return rows
+
+    def random_ids(self, count, **filters):
+        """Up to count distinct random game ids among rows matching filters, in random order."""
+        rows = self.matching_rows(**filters)
+        rows = np.random.default_rng().choice(rows, size=min(count, len(rows)), replace=False)
+        return self.arrays["ids"][rows].tolist()
+
+    def genre_ids(self, row):
+        mask = int(self.arrays["genre_masks"][row])
+        return [genre_id for genre_id, bit in self.genre_bits.items() if mask >> bit & 1]
+
+    def load_all(self, genre_bits):
+        """
+        Read the whole snapshot into memory (used when merging), re-mapping
+        genre bits to genre_bits. Returns (columns, names).
+        """
+        columns = {key: np.array(self.arrays[key]) for key in ("ids", "release_dates", "ratings")}
+        old_masks = np.array(self.arrays["genre_masks"])
+        new_masks = np.zeros(len(self), dtype="uint64")
+        for genre_id, old_bit in self.genre_bits.items():
+            new_bit = genre_bits.get(genre_id)
+            if new_bit is not None:
+                has_genre = (old_masks >> np.uint64(old_bit)) & np.uint64(1)
+                new_masks |= has_genre << np.uint64(new_bit)
+        columns["genre_masks"] = new_masks
+        offsets = self.arrays["name_offsets"]
+        names = [self.names[offsets[i]:offsets[i + 1] - 1].decode("utf-8") for i in range(len(self))]
+        return columns, names
@@ -0,0 +1,155 @@
+# This file is the command line entry point for the IGDB Game Searcher.
+# It runs searches and random draws without the GUI, and starts the shared
+# search service (see search_service.py).
+#
+#   python cli.py serve --port 8765
+#   python cli.py --service http://127.0.0.1:8765 search zelda --genre Adventure -o zelda.xlsx
+#   python cli.py random -n 100 -o random.csv
+#   python cli.py ids my_ids.txt -o enriched.csv
+
+# Author: Nelson McFadyen
+# Last Updated: October 18, 2026
+
+import os
+import sys
+import argparse
+
+
+def write_output(df, output):
+    """Write results to .xlsx or .csv, or as CSV to stdout when no file is given."""
+    if not output:
+        df.to_csv(sys.stdout, index=False)
+    elif output.lower().endswith('.xlsx'):
+        df.to_excel(output, index=False)
+    else:
+        df.to_csv(output, index=False)
+    if output:
+        print(f"Saved {len(df)} games to {output}")
+
+
+def genre_ids_from_names(names, genre_map):
+    by_name = {name.lower(): genre_id for genre_id, name in genre_map.items()}
+    genre_ids = []
+    for name in names:
+        if name.lower() not in by_name:
+            raise SystemExit(f"Unknown genre '{name}'. Known genres: {', '.join(sorted(genre_map.values()))}")
+        genre_ids.append(by_name[name.lower()])
+    return genre_ids
+
+
+def run_serve(args):
+    import search_service
+    search_service.serve(args.host, args.port)
+
+
+def run_search(args):
+    import pandas as pd
+    import api
+    import processing
+
+    genre_ids = genre_ids_from_names(args.genre, api.GENRE_MAP)
+    query = api.Query(processing.SEARCH_FIELDS).search(args.title.strip().lower())
+    frames = []
+    seen_ids = set()
+    for page in api.iter_query_pages(query):
+        frame = processing.games_to_frame(page)
+        frame = processing.filter_by_genres(frame, genre_ids)
+        frame = processing.drop_seen(frame, seen_ids)
+        seen_ids.update(frame["id"].tolist())
+        frames.append(processing.build_result_frame(frame, api.GENRE_MAP, api.PLATFORM_MAP))
+    results = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=processing.RESULT_COLUMNS)
+    write_output(results, args.output)
+
+
+def run_random(args):
+    import pandas as pd
+    import api
+    import processing
+
+    genre_id = genre_ids_from_names([args.genre], api.GENRE_MAP)[0] if args.genre else None
+    games = api.draw_random_games(args.count, processing.RANDOM_GAME_FIELDS, genre_id, args.platform)
+    write_output(pd.DataFrame([processing.game_to_record(game) for game in games]), args.output)
+
+
+def run_ids(args):
+    import pandas as pd
+    import api
+    import processing
+
+    game_ids = processing.read_game_ids(args.file)
+    if not game_ids:
+        raise SystemExit(f"No game ids found in {args.file}")
+    print(f"Fetching {len(game_ids)} games in batches of 500...", file=sys.stderr)
+
+    # CSV output is written batch by batch as the records arrive; Excel
+    # files can't be appended to, so those are written once at the end.
+    to_excel = bool(args.output) and args.output.lower().endswith('.xlsx')
+    frames = []
+    written = 0
+    for page in api.iter_games_by_ids(game_ids, processing.SEARCH_FIELDS):
+        frame = processing.build_result_frame(processing.games_to_frame(page), api.GENRE_MAP, api.PLATFORM_MAP)
+        if to_excel:
+            frames.append(frame)
+        elif args.output:
+            frame.to_csv(args.output, mode='w' if written == 0 else 'a', header=written == 0, index=False)
+        else:
+            frame.to_csv(sys.stdout, header=written == 0, index=False)
+        written += len(frame)
+    if to_excel:
+        results = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=processing.RESULT_COLUMNS)
+        results.to_excel(args.output, index=False)
+    elif args.output and written == 0:
+        pd.DataFrame(columns=processing.RESULT_COLUMNS).to_csv(args.output, index=False)
+    print(f"Found {written} of {len(game_ids)} games"
+          + (f", saved to {args.output}" if args.output else ""), file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="IGDB Game Searcher command line tools.")
+    parser.add_argument('--service', metavar='URL',
+                        help="Send requests through a shared search service instead of "
+                             "straight to IGDB (same as setting IGDB_SERVICE_URL).")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help="Run the shared local search service.")
+    serve_parser.add_argument('--host', default='127.0.0.1',
+                              help="Address to listen on. Anything but 127.0.0.1 needs IGDB_SERVICE_TOKEN set.")
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.set_defaults(func=run_serve)
+
+    search_parser = subparsers.add_parser('search', help="Search games by title.")
+    search_parser.add_argument('title')
+    search_parser.add_argument('--genre', action='append', default=[],
+                               help="Only keep games with this genre (repeatable).")
+    search_parser.add_argument('-o', '--output', help="Output .xlsx or .csv file (default: CSV to stdout).")
+    search_parser.set_defaults(func=run_search)
+
+    random_parser = subparsers.add_parser('random', help="Draw random games.")
+    random_parser.add_argument('-n', '--count', type=int, default=1)
+    random_parser.add_argument('--genre', help="Only draw games with this genre.")
+    random_parser.add_argument('--platform', type=int, help="Only draw games on this platform id.")
+    random_parser.add_argument('-o', '--output', help="Output .xlsx or .csv file (default: CSV to stdout).")
+    random_parser.set_defaults(func=run_random)
+
+    ids_parser = subparsers.add_parser('ids', help="Fetch fresh details for a file of IGDB game ids.")
+    ids_parser.add_argument('file', help="Text file of ids, or a .csv/.xlsx export with an ID column.")
+    ids_parser.add_argument('-o', '--output', help="Output .xlsx or .csv file (default: CSV to stdout).")
+    ids_parser.set_defaults(func=run_ids)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # api.py reads the service URL when it is first imported, so set it before
+    # any command imports it.
+    if args.service:
+        os.environ['IGDB_SERVICE_URL'] = args.service
+    import api
+    try:
+        args.func(args)
+    except api.IGDBRequestError as e:
+        raise SystemExit(str(e))
+
+
+if __name__ == "__main__":
+    main()
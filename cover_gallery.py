@@ -0,0 +1,261 @@
+# This file is the cover_gallery module for the IGDB Game Searcher application.
+# It shows search results in a table with a cover thumbnail column. Covers
+# are downloaded and decoded only for rows in or near the visible part of
+# the table, on a small thread pool, and decoded thumbnails are kept in a
+# memory-capped LRU cache so scrolling through thousands of rows stays smooth.
+
+# Author: Nelson McFadyen
+# Last Updated: October 18, 2026
+
+from collections import OrderedDict
+
+import requests
+from PyQt5.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+from PyQt5.QtGui import QImage, QPixmap, QColor
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, QTimer, QSize, pyqtSignal
+)
+
+THUMB_WIDTH = 64
+THUMB_HEIGHT = 90
+MAX_DOWNLOADS = 4                   # concurrent cover downloads
+MAX_PIXMAP_BYTES = 32 * 1024 * 1024  # decoded thumbnails kept in memory
+PREFETCH_SCREENS = 1                # rows above/below the viewport to load, in screens
+
+COLUMNS = ["Cover", "Name", "Release Date", "Rating", "Genres", "Platforms"]
+
+
+def thumbnail_url(cover_url):
+    """The small IGDB cover size for a result's "Cover URL", or None if it has none."""
+    if not isinstance(cover_url, str) or not cover_url.startswith("http"):
+        return None
+    return cover_url.replace("/t_cover_big/", "/t_cover_small/")
+
+
+# -----------------------
+# Background Cover Downloads
+# -----------------------
+class CoverSignals(QObject):
+    loaded = pyqtSignal(str, QImage)  # url, decoded image (null on failure)
+
+
+class CoverTask(QRunnable):
+    def __init__(self, url, session, signals):
+        super().__init__()
+        self.url = url
+        self.session = session
+        self.signals = signals
+        # Set from the GUI thread when the row scrolls out of range; a queued
+        # task then returns without downloading, a running one drops its result.
+        self.cancelled = False
+
+    def run(self):
+        if self.cancelled:
+            return
+        image = QImage()
+        try:
+            response = self.session.get(self.url, timeout=10)
+            if response.status_code == 200 and not self.cancelled:
+                image.loadFromData(response.content)
+        except requests.RequestException as e:
+            print(f"Error loading cover {self.url}: {e}")
+        if self.cancelled:
+            return
+        if not image.isNull():
+            image = image.scaled(THUMB_WIDTH, THUMB_HEIGHT, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        self.signals.loaded.emit(self.url, image)
+
+
+class CoverLoader(QObject):
+    """Downloads thumbnails on a bounded pool and keeps an LRU cache of pixmaps."""
+    cover_loaded = pyqtSignal(str)
+
+    def __init__(self, max_downloads=MAX_DOWNLOADS, max_bytes=MAX_PIXMAP_BYTES, parent=None):
+        super().__init__(parent)
+        self.max_bytes = max_bytes
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_downloads)
+        self.session = requests.Session()
+        self.signals = CoverSignals()
+        self.signals.loaded.connect(self.on_loaded)
+        self._pixmaps = OrderedDict()  # url -> QPixmap, least recently used first
+        self._bytes = 0
+        self._pending = {}             # url -> CoverTask
+        self._failed = set()
+
+    def pixmap(self, url):
+        pixmap = self._pixmaps.get(url)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(url)
+        return pixmap
+
+    def request(self, url):
+        if url in self._pixmaps or url in self._pending or url in self._failed:
+            return
+        task = CoverTask(url, self.session, self.signals)
+        self._pending[url] = task
+        self.pool.start(task)
+
+    def retain(self, urls):
+        """Cancel pending downloads whose url is not in urls."""
+        for url in [url for url in self._pending if url not in urls]:
+            self._pending.pop(url).cancelled = True
+
+    def on_loaded(self, url, image):
+        if self._pending.pop(url, None) is None:
+            return  # cancelled after it finished downloading
+        if image.isNull():
+            self._failed.add(url)
+            return
+        pixmap = QPixmap.fromImage(image)
+        self._pixmaps[url] = pixmap
+        self._bytes += pixmap_bytes(pixmap)
+        while self._bytes > self.max_bytes and len(self._pixmaps) > 1:
+            _, evicted = self._pixmaps.popitem(last=False)
+            self._bytes -= pixmap_bytes(evicted)
+        self.cover_loaded.emit(url)
+
+    def shutdown(self):
+        self.retain(set())
+        self.pool.waitForDone()
+
+
+def pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+# -----------------------
+# Results Table
+# -----------------------
+class ResultsModel(QAbstractTableModel):
+    """
+    Table model over the search window's list of result records. It shows
+    either every record in order, or the records at the positions given to
+    set_rows (a sorted / filtered view).
+    """
+
+    def __init__(self, games, loader, parent=None):
+        super().__init__(parent)
+        self.games = games  # shared with GameSearchWindow.games_list
+        self.rows = None    # positions in games shown, or None for all of them
+        self.loader = loader
+        self.loader.cover_loaded.connect(self.on_cover_loaded)
+        self._rows_by_url = {}  # thumbnail url -> rows currently in range
+
+    def game_at(self, row):
+        return self.games[row if self.rows is None else self.rows[row]]
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.games) if self.rows is None else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        game = self.game_at(index.row())
+        column = COLUMNS[index.column()]
+        if column == "Cover":
+            # Only ever served from the cache; downloads are started by the
+            # view for the rows around the viewport.
+            if role == Qt.DecorationRole:
+                url = thumbnail_url(game.get("Cover URL"))
+                pixmap = self.loader.pixmap(url) if url else None
+                return pixmap if pixmap is not None else QColor(Qt.darkGray)
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            value = game.get(column)
+            return "" if value is None else str(value)
+        return None
+
+    def add_games(self, games):
+        if not games:
+            return
+        if self.rows is not None:
+            # A sorted / filtered view is rebuilt by its owner with set_rows.
+            self.games.extend(games)
+            return
+        first = len(self.games)
+        self.beginInsertRows(QModelIndex(), first, first + len(games) - 1)
+        self.games.extend(games)
+        self.endInsertRows()
+
+    def load_covers(self, first_row, last_row):
+        """Request covers for rows first_row..last_row and cancel all others."""
+        self._rows_by_url = {}
+        for row in range(max(first_row, 0), min(last_row, self.rowCount() - 1) + 1):
+            url = thumbnail_url(self.game_at(row).get("Cover URL"))
+            if url:
+                self._rows_by_url.setdefault(url, []).append(row)
+        self.loader.retain(self._rows_by_url)
+        for url in self._rows_by_url:
+            self.loader.request(url)
+
+    def on_cover_loaded(self, url):
+        for row in self._rows_by_url.get(url, []):
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+
+class CoverTableView(QTableView):
+    """Results table that loads covers for the rows in (and near) the viewport."""
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setIconSize(QSize(THUMB_WIDTH, THUMB_HEIGHT))
+        # Fixed row heights keep scrolling cheap for thousands of rows.
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(THUMB_HEIGHT + 4)
+        self.horizontalHeader().setSectionResizeMode(0, QHeaderView.Fixed)
+        self.setColumnWidth(0, THUMB_WIDTH + 8)
+        self.horizontalHeader().setStretchLastSection(True)
+
+        # Coalesce bursts of scroll/resize events into one cover update.
+        self.cover_timer = QTimer(self)
+        self.cover_timer.setSingleShot(True)
+        self.cover_timer.setInterval(50)
+        self.cover_timer.timeout.connect(self.load_visible_covers)
+        self.verticalScrollBar().valueChanged.connect(self.schedule_cover_update)
+        model.rowsInserted.connect(self.schedule_cover_update)
+        model.modelReset.connect(self.schedule_cover_update)
+
+    def schedule_cover_update(self, *args):
+        self.cover_timer.start()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_cover_update()
+
+    def visible_rows(self):
+        first = self.rowAt(0)
+        if first < 0:
+            return None
+        last = self.rowAt(self.viewport().height() - 1)
+        if last < 0:
+            last = self.model().rowCount() - 1
+        return first, last
+
+    def load_visible_covers(self):
+        rows = self.visible_rows()
+        if rows is None:
+            self.model().load_covers(0, -1)
+            return
+        first, last = rows
+        margin = (last - first + 1) * PREFETCH_SCREENS
+        self.model().load_covers(first - margin, last + margin)
@@ -4,23 +4,43 @@
 # Author: Nelson McFadyen
 # Last Updated: April 19, 2025 (updated back-to-main behavior)
 
+import os
 import sys
+import hashlib
 import pandas as pd
 import qdarkstyle
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QLineEdit, QPushButton,
     QVBoxLayout, QHBoxLayout, QGridLayout, QProgressBar, QListWidget,
-    QMessageBox, QFileDialog, QCheckBox, QSizePolicy
+    QMessageBox, QFileDialog, QCheckBox, QSizePolicy, QComboBox, QSpinBox
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import QThread, pyqtSignal, QObject, Qt
 
 import api  # Now all API logic is centralized in api.py
+import catalog_snapshot
+import cover_gallery
+import processing
+import profiling
+import result_index
+import search_cache
+import session_store
 
 # Global state similar to your original code
 existing_game_ids = set()  # To avoid duplicate games across sessions
 searched_titles = set()    # Track which titles have been searched
+# Unfiltered results of earlier title searches; kept for the whole app run so
+# genre-narrowed repeats of a title are answered without hitting IGDB.
+result_cache = search_cache.SearchCache()
+
+# Fields for the single-pass search (everything, for every candidate).
+FULL_SEARCH_FIELDS = processing.SEARCH_FIELDS
+# Two-phase search: a slim candidate pass with only what filtering needs,
+# then full details (with the cover expanded) for the survivors.
+SLIM_SEARCH_FIELDS = "id, genres, platforms, first_release_date"
+DETAIL_FIELDS = FULL_SEARCH_FIELDS
+PAGE_SIZE = 500
 
 # -----------------------
 # Worker Class for Searching
@@ -30,70 +50,151 @@ class SearchWorker(QObject):
     finished = pyqtSignal(list, str)  # list of game records, searched title
     error = pyqtSignal(str)
     
-    def __init__(self, game_title, selected_genre_ids):
+    def __init__(self, game_title, selected_genre_ids, two_phase=True, snapshot=None, game_ids=None):
         super().__init__()
         self.game_title = game_title
         self.selected_genre_ids = selected_genre_ids
+        self.two_phase = two_phase
+        # CatalogSnapshot to take candidates from instead of the IGDB title search
+        self.snapshot = snapshot
+        # Id-list mode: enrich these ids instead of searching by title
+        self.game_ids = game_ids
+        # Number of pages, when known up front (id-list mode)
+        self.total_pages = None
         
     def run(self):
+        with profiling.profile_operation("search", query=self.game_title,
+                                         genre_ids=list(self.selected_genre_ids),
+                                         two_phase=self.two_phase,
+                                         from_snapshot=self.snapshot is not None,
+                                         id_count=len(self.game_ids) if self.game_ids is not None else None) as operation:
+            self.search(operation)
+
+    def id_pages(self):
+        """
+        Yields (page, True) for id-list mode: full records for every batch of
+        PAGE_SIZE ids, one `where id = (...)` request each, with the next
+        batch already being fetched while this one is processed.
+        """
+        self.total_pages = -(-len(self.game_ids) // PAGE_SIZE)
+        for page in api.iter_games_by_ids(self.game_ids, FULL_SEARCH_FIELDS, batch_size=PAGE_SIZE):
+            result_cache.put_details(page)
+            yield page, True
+
+    def snapshot_pages(self):
+        """
+        Yields (page, False) of candidates from the local catalog snapshot:
+        names containing the title, already narrowed to the selected genres
+        with the genre bitmasks. Details are fetched by id afterwards.
+        """
+        with profiling.span("snapshot.filter", rows=len(self.snapshot)):
+            rows = self.snapshot.matching_rows(genre_ids=self.selected_genre_ids, name=self.game_title)
+        ids = self.snapshot.arrays["ids"]
+        for start in range(0, len(rows), PAGE_SIZE):
+            yield [{"id": int(ids[row]), "genres": self.snapshot.genre_ids(row)}
+                   for row in rows[start:start + PAGE_SIZE]], False
+
+    def candidate_pages(self, operation):
+        """
+        Yields (page, has_full_fields) for the title search: from the cache
+        when this title was searched before (whatever genres were selected),
+        otherwise from IGDB, caching the unfiltered pages as they arrive.
+        """
+        if self.game_ids is not None:
+            yield from self.id_pages()
+            return
+        if self.snapshot is not None:
+            yield from self.snapshot_pages()
+            return
+
+        cached = result_cache.get_candidates(self.game_title)
+        operation.annotate(from_cache=cached is not None)
+        if cached is not None:
+            games, has_full_fields = cached
+            for start in range(0, len(games), PAGE_SIZE):
+                yield games[start:start + PAGE_SIZE], has_full_fields
+            return
+
+        has_full_fields = not self.two_phase
+        fields = FULL_SEARCH_FIELDS if has_full_fields else SLIM_SEARCH_FIELDS
+        query = api.Query(fields).search(self.game_title)
+        fetched = []
+        for page in api.iter_query_pages(query, page_size=PAGE_SIZE):
+            fetched.extend(page)
+            if has_full_fields:
+                result_cache.put_details(page)
+            yield page, has_full_fields
+        # Only reached when pagination ended on its real last page (a short
+        # or empty one). A failed page raises IGDBRequestError out of the
+        # loop, and an abandoned search never resumes the generator, so a
+        # truncated candidate list is never cached.
+        result_cache.put_candidates(self.game_title, fetched, has_full_fields)
+
+    def search(self, operation):
         try:
-            all_game_data = []
-            offset = 0
-            # Retrieve all game data matching the search title
-            while True:
-                query = (f"fields name, first_release_date, rating, genres, storyline, summary, "
-                         f"platforms, cover, id; search \"{self.game_title}\"; limit 500; offset {offset};")
-                game_data = api.get_game_data(query)
-                if not game_data:
-                    break
-                all_game_data.extend(game_data)
-                offset += 500
-                if len(game_data) < 500:
-                    break
-            if not all_game_data:
+            results = []
+            found_any = False
+            matched_any = False
+            pages_done = 0
+            candidates = 0
+            # Each page is filtered and processed while the next page is
+            # still being fetched in the background.
+            for page, has_full_fields in self.candidate_pages(operation):
+                found_any = found_any or bool(page)
+                candidates += len(page)
+                # Filter games by selected genres (if any), then drop ones we already have
+                with profiling.span("process.filter", rows=len(page)):
+                    frame = processing.games_to_frame(page)
+                    frame = processing.filter_by_genres(frame, self.selected_genre_ids)
+                    matched_any = matched_any or not frame.empty
+                    frame = processing.drop_seen(frame, existing_game_ids)
+                if not frame.empty:
+                    if not has_full_fields:
+                        frame = self.fetch_details(frame["id"].tolist())
+                    with profiling.span("process.records", rows=len(frame)):
+                        self.add_page(frame, results)
+                pages_done += 1
+                # For title searches the number of pages is only known once a
+                # short page arrives.
+                total_pages = self.total_pages
+                if total_pages is None:
+                    total_pages = pages_done + 1 if len(page) == PAGE_SIZE else pages_done
+                with profiling.span("qt.signal", signal="progress"):
+                    self.progress.emit(pages_done, total_pages)
+            operation.annotate(pages=pages_done, candidates=candidates, rows=len(results))
+
+            if not found_any:
                 self.finished.emit([], self.game_title)
                 return
-            
-            # Filter games by selected genres (if any)
-            if self.selected_genre_ids:
-                filtered_game_data = [
-                    game for game in all_game_data
-                    if 'genres' in game and any(genre in self.selected_genre_ids for genre in game['genres'])
-                ]
-            else:
-                filtered_game_data = all_game_data
-            
-            if not filtered_game_data:
+            if not matched_any:
                 self.error.emit("No games match the selected genres.")
                 self.finished.emit([], self.game_title)
                 return
-            
-            total = len(filtered_game_data)
-            results = []
-            count = 0
-            for game in filtered_game_data:
-                count += 1
-                if game.get('id') in existing_game_ids:
-                    self.progress.emit(count, total)
-                    continue
-                game_info = {
-                    "Name": game.get('name', 'Not Available'),
-                    "Release Date": api.format_unix_timestamp(game.get('first_release_date')),
-                    "Rating": game.get('rating', 'Not Available'),
-                    "Genres": ', '.join(api.fetch_genre_names(game.get('genres', []), api.GENRE_MAP)),
-                    "Storyline": game.get('storyline', 'Not Available'),
-                    "Summary": game.get('summary', 'Not Available'),
-                    "Platforms": ', '.join(api.fetch_platform_names(game.get('platforms', []), api.PLATFORM_MAP)),
-                    "Cover URL": api.fetch_cover_image(game.get('cover'))
-                }
-                results.append(game_info)
-                existing_game_ids.add(game.get('id'))
-                self.progress.emit(count, total)
-            self.finished.emit(results, self.game_title)
+            with profiling.span("qt.signal", signal="finished", rows=len(results)):
+                self.finished.emit(results, self.game_title)
         except Exception as e:
+            # The pages already processed are thrown away, so don't leave
+            # their games marked as seen.
+            existing_game_ids.difference_update(record["ID"] for record in results)
+            operation.annotate(error=str(e))
             self.error.emit(str(e))
             self.finished.emit([], self.game_title)
 
+    def add_page(self, page_frame, results):
+        records = processing.build_result_frame(page_frame, api.GENRE_MAP, api.PLATFORM_MAP)
+        results.extend(records.to_dict("records"))
+        existing_game_ids.update(page_frame["id"].tolist())
+
+    def fetch_details(self, game_ids):
+        # Only ids that aren't cached from an earlier search go to IGDB.
+        found, missing_ids = result_cache.get_details(game_ids)
+        if missing_ids:
+            fetched = api.fetch_games_by_ids(missing_ids, DETAIL_FIELDS)
+            result_cache.put_details(fetched)
+            found.update((game['id'], game) for game in fetched)
+        # Keep the search's relevance order rather than the id order of the batch.
+        return processing.games_to_frame([found[game_id] for game_id in game_ids if game_id in found])
+
 # -----------------------
 # Main Game Search Window (PyQt version)
 # -----------------------
@@ -101,8 +202,18 @@ class GameSearchWindow(QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("IGDB Game Searcher")
-        self.resize(800, 500)
+        self.resize(900, 750)
         self.games_list = []  # local storage of game records
+        # Rating/date/genre/platform indexes over games_list for the results table
+        self.result_index = result_index.ResultIndex()
+        self.session = None   # SessionStore, created on the first search
+
+        # Tools menu: profiling can also be switched on with IGDB_PROFILE_DIR
+        tools_menu = self.menuBar().addMenu("Tools")
+        self.profiling_action = tools_menu.addAction("Profile Searches and Saves")
+        self.profiling_action.setCheckable(True)
+        self.profiling_action.setChecked(profiling.is_enabled())
+        self.profiling_action.toggled.connect(profiling.set_enabled)
         
         # Main layout
         central_widget = QWidget(self)
@@ -135,6 +246,18 @@ class GameSearchWindow(QMainWindow):
         game_title_row.addWidget(self.entry)
         left_column.addLayout(game_title_row)
 
+        # Two-phase fetch: slim candidate pass, full details only for new matches
+        self.two_phase_checkbox = QCheckBox("Fetch details only for new matches (faster)", self)
+        self.two_phase_checkbox.setChecked(True)
+        left_column.addWidget(self.two_phase_checkbox)
+
+        # Match titles and genres against the local catalog snapshot instead
+        # of IGDB's title search (only details are requested).
+        self.snapshot = catalog_snapshot.CatalogSnapshot.open()
+        self.snapshot_checkbox = QCheckBox(self)
+        left_column.addWidget(self.snapshot_checkbox)
+        self.update_snapshot_checkbox()
+
         # Row 2 (Left Column): "Select Genres:" label
         select_genres_label = QLabel("Select Genres:", self)
         left_column.addWidget(select_genres_label)
@@ -180,6 +303,65 @@ class GameSearchWindow(QMainWindow):
         self.live_count_label = QLabel("Unique Games Added: 0", self)
         main_layout.addWidget(self.live_count_label)
 
+        self.cache_stats_label = QLabel(result_cache.stats_text(), self)
+        main_layout.addWidget(self.cache_stats_label)
+
+        # Sort / filter controls for the results table. They are answered from
+        # result_index, so they never rescan games_list or call the API.
+        view_layout = QHBoxLayout()
+        view_layout.setSpacing(5)
+        view_layout.addWidget(QLabel("Sort:", self))
+        self.sort_combo = QComboBox(self)
+        for label, sort_by, descending in (
+            ("Order Added", result_index.SORT_ORDER_ADDED, False),
+            ("Rating (High to Low)", result_index.SORT_RATING, True),
+            ("Rating (Low to High)", result_index.SORT_RATING, False),
+            ("Release Date (Newest)", result_index.SORT_RELEASE_DATE, True),
+            ("Release Date (Oldest)", result_index.SORT_RELEASE_DATE, False),
+        ):
+            self.sort_combo.addItem(label, (sort_by, descending))
+        view_layout.addWidget(self.sort_combo)
+        view_layout.addWidget(QLabel("Min Rating:", self))
+        self.min_rating_spin = QSpinBox(self)
+        self.min_rating_spin.setRange(0, 100)
+        self.min_rating_spin.setSpecialValueText("Any")
+        view_layout.addWidget(self.min_rating_spin)
+        view_layout.addWidget(QLabel("Released:", self))
+        self.year_from_spin = QSpinBox(self)
+        self.year_to_spin = QSpinBox(self)
+        for spin in (self.year_from_spin, self.year_to_spin):
+            spin.setRange(1949, 2100)
+            spin.setSpecialValueText("Any")
+            view_layout.addWidget(spin)
+        view_layout.addWidget(QLabel("Genre:", self))
+        self.view_genre_combo = QComboBox(self)
+        self.view_genre_combo.addItem("Any", None)
+        for name in sorted(api.GENRE_MAP.values()):
+            self.view_genre_combo.addItem(name, name)
+        view_layout.addWidget(self.view_genre_combo)
+        view_layout.addWidget(QLabel("Platform:", self))
+        self.view_platform_combo = QComboBox(self)
+        self.view_platform_combo.addItem("Any", None)
+        for name in sorted(api.PLATFORM_MAP.values()):
+            self.view_platform_combo.addItem(name, name)
+        view_layout.addWidget(self.view_platform_combo)
+        view_layout.addStretch()
+        self.showing_label = QLabel(self)
+        view_layout.addWidget(self.showing_label)
+        main_layout.addLayout(view_layout)
+
+        # Results table; cover thumbnails load only for rows near the viewport.
+        self.cover_loader = cover_gallery.CoverLoader(parent=self)
+        self.results_model = cover_gallery.ResultsModel(self.games_list, self.cover_loader, self)
+        self.results_view = cover_gallery.CoverTableView(self.results_model, self)
+        main_layout.addWidget(self.results_view, stretch=1)
+
+        for combo in (self.sort_combo, self.view_genre_combo, self.view_platform_combo):
+            combo.currentIndexChanged.connect(self.apply_view)
+        for spin in (self.min_rating_spin, self.year_from_spin, self.year_to_spin):
+            spin.valueChanged.connect(self.apply_view)
+        self.apply_view()
+
         # Buttons: Search, Save, Back
         button_layout = QHBoxLayout()
         button_layout.setSpacing(10)
@@ -191,12 +373,72 @@ class GameSearchWindow(QMainWindow):
         self.save_button.clicked.connect(self.on_save)
         button_layout.addWidget(self.save_button)
 
+        self.id_list_button = QPushButton("Load ID List", self)
+        self.id_list_button.clicked.connect(self.on_load_id_list)
+        button_layout.addWidget(self.id_list_button)
+
+        self.snapshot_button = QPushButton("Save Snapshot", self)
+        self.snapshot_button.clicked.connect(self.on_save_snapshot)
+        button_layout.addWidget(self.snapshot_button)
+
+        self.resume_button = QPushButton("Resume Last Session", self)
+        self.resume_button.clicked.connect(self.on_resume_session)
+        self.resume_button.setEnabled(session_store.latest_session_path() is not None)
+        button_layout.addWidget(self.resume_button)
+
         self.back_button = QPushButton("Back to Main Page", self)
         self.back_button.clicked.connect(self.back_to_main)
         button_layout.addWidget(self.back_button)
 
         main_layout.addLayout(button_layout)
 
+    def set_buttons_enabled(self, enabled):
+        self.search_button.setEnabled(enabled)
+        self.id_list_button.setEnabled(enabled)
+        self.save_button.setEnabled(enabled)
+        self.snapshot_button.setEnabled(enabled)
+        self.resume_button.setEnabled(enabled and self.session is None
+                                      and session_store.latest_session_path() is not None)
+        self.back_button.setEnabled(enabled)
+
+    def update_snapshot_checkbox(self):
+        snapshot_size = len(self.snapshot) if self.snapshot is not None else 0
+        self.snapshot_checkbox.setText(f"Search the local catalog snapshot ({snapshot_size} games)")
+        self.snapshot_checkbox.setEnabled(snapshot_size > 0)
+        if not snapshot_size:
+            self.snapshot_checkbox.setChecked(False)
+
+    def add_results(self, games):
+        self.result_index.add(games)
+        self.results_model.add_games(games)
+        if self.results_model.rows is not None:
+            self.apply_view()
+        else:
+            self.update_showing_label()
+
+    def apply_view(self, *args):
+        sort_by, descending = self.sort_combo.currentData()
+        year_range = tuple(spin.value() if spin.value() != spin.minimum() else None
+                           for spin in (self.year_from_spin, self.year_to_spin))
+        filtered = (self.min_rating_spin.value() or any(year is not None for year in year_range)
+                    or self.view_genre_combo.currentData() or self.view_platform_combo.currentData())
+        if not filtered and sort_by == result_index.SORT_ORDER_ADDED:
+            rows = None
+        else:
+            with profiling.span("index.select", rows=self.result_index.count):
+                rows = self.result_index.select(
+                    min_rating=self.min_rating_spin.value() or None,
+                    year_range=year_range,
+                    genre=self.view_genre_combo.currentData(),
+                    platform=self.view_platform_combo.currentData(),
+                    sort_by=sort_by, descending=descending
+                )
+        self.results_model.set_rows(rows)
+        self.update_showing_label()
+
+    def update_showing_label(self):
+        self.showing_label.setText(f"Showing {self.results_model.rowCount()} of {len(self.games_list)}")
+
     def get_selected_genre_ids(self):
         selected_ids = []
         for genre, checkbox in self.genre_checkboxes.items():
@@ -228,14 +470,44 @@ class GameSearchWindow(QMainWindow):
             QMessageBox.information(self, "Duplicate Search", f"Search for '{search_key}' has already been done.")
             return
         
-        self.search_button.setEnabled(False)
-        self.save_button.setEnabled(False)
-        self.back_button.setEnabled(False)
-        
         selected_genre_ids = self.get_selected_genre_ids()
-        
+        self.start_worker(SearchWorker(game_title, selected_genre_ids,
+                                       two_phase=self.two_phase_checkbox.isChecked(),
+                                       snapshot=self.snapshot if self.snapshot_checkbox.isChecked() else None))
+
+    def on_load_id_list(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Load ID List", "", "ID Lists (*.txt *.csv *.xlsx);;All Files (*)"
+        )
+        if not file_path:
+            return
+        try:
+            game_ids = processing.read_game_ids(file_path)
+            with open(file_path, "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()[:8]
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"An error occurred while reading the ID list: {str(e)}")
+            return
+        if not game_ids:
+            QMessageBox.warning(self, "Input Error", "No game ids were found in that file.")
+            return
+
+        # Id lists go through the same pipeline (and search history) as a
+        # title search; selected genres narrow the list down. The key holds
+        # the full path and a hash of the contents, so a different file with
+        # the same name, or an updated one, isn't taken for a repeat.
+        game_title = f"ids: {os.path.abspath(file_path)} [{digest}]"
+        selected_genre_names = self.get_selected_genre_names()
+        search_key = f"{game_title} | {','.join(selected_genre_names)}" if selected_genre_names else game_title
+        if search_key in searched_titles:
+            QMessageBox.information(self, "Duplicate Search", f"Search for '{search_key}' has already been done.")
+            return
+        self.start_worker(SearchWorker(game_title, self.get_selected_genre_ids(), game_ids=game_ids))
+
+    def start_worker(self, worker):
+        self.set_buttons_enabled(False)
         self.thread = QThread()
-        self.worker = SearchWorker(game_title, selected_genre_ids)
+        self.worker = worker
         self.worker.moveToThread(self.thread)
         self.thread.started.connect(self.worker.run)
         self.worker.progress.connect(self.update_progress)
@@ -262,20 +534,18 @@ class GameSearchWindow(QMainWindow):
         self.search_history_list.insertItem(0, f"{len(searched_titles)}) {search_key}")
         self.progress_bar.setValue(0)
         self.entry.clear()
+        self.record_search(search_key, results)
+        self.cache_stats_label.setText(result_cache.stats_text())
         if not results:
             QMessageBox.information(self, "No Results", f"No game data found for '{search_key}'.")
         else:
-            self.games_list.extend(results)
+            self.add_results(results)
             QMessageBox.information(self, "Success", f"Game data for '{search_key}' has been fetched.")
-        self.search_button.setEnabled(True)
-        self.save_button.setEnabled(True)
-        self.back_button.setEnabled(True)
+        self.set_buttons_enabled(True)
         
     def search_error(self, error_message):
         QMessageBox.information(self, "Error", error_message)
-        self.search_button.setEnabled(True)
-        self.save_button.setEnabled(True)
-        self.back_button.setEnabled(True)
+        self.set_buttons_enabled(True)
         
     def on_save(self):
         if not self.games_list:
@@ -284,17 +554,78 @@ class GameSearchWindow(QMainWindow):
         file_path, _ = QFileDialog.getSaveFileName(self, "Save File", "", "Excel Files (*.xlsx);;All Files (*)")
         if file_path:
             try:
-                df = pd.DataFrame(self.games_list)
-                df.to_excel(file_path, index=False)
+                with profiling.profile_operation("save_excel", path=file_path, rows=len(self.games_list)):
+                    df = pd.DataFrame(self.games_list)
+                    df.to_excel(file_path, index=False)
                 QMessageBox.information(self, "Success", f"File saved successfully to {file_path}")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"An error occurred while saving: {str(e)}")
 
+    def on_save_snapshot(self):
+        if not self.games_list:
+            QMessageBox.warning(self, "No Data", "There are no games to save.")
+            return
+        # Release the memory map before the snapshot files are replaced.
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+        try:
+            with profiling.profile_operation("save_snapshot", rows=len(self.games_list)):
+                total = catalog_snapshot.save_results(self.games_list, api.GENRE_MAP)
+            QMessageBox.information(self, "Success",
+                                    f"Catalog snapshot now holds {total} games ({catalog_snapshot.SNAPSHOT_DIR}).")
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"An error occurred while saving the snapshot: {str(e)}")
+        self.snapshot = catalog_snapshot.CatalogSnapshot.open()
+        self.update_snapshot_checkbox()
+
+    def record_search(self, search_key, results):
+        # Persist every search as it finishes so the session survives a crash.
+        try:
+            if self.session is None:
+                self.session = session_store.SessionStore.new_session()
+            self.session.append_search(search_key, results)
+        except OSError as e:
+            print(f"Could not save session: {e}")
+
+    def on_resume_session(self):
+        path = session_store.latest_session_path()
+        if path is None:
+            QMessageBox.information(self, "No Session", "There is no previous session to resume.")
+            return
+        session = session_store.SessionStore(path)
+        try:
+            search_keys, games, game_ids = session.load()
+        except OSError as e:
+            # Keep recording to the current session if the old one can't be read.
+            QMessageBox.critical(self, "Error", f"An error occurred while loading the session: {str(e)}")
+            return
+        if self.session is not None:
+            self.session.close()
+        self.session = session
+
+        # Merge the stored session into the current one and keep appending to it.
+        for search_key in search_keys:
+            if search_key not in searched_titles:
+                searched_titles.add(search_key)
+                self.search_history_list.insertItem(0, f"{len(searched_titles)}) {search_key}")
+        self.add_results([game for game in games if game.get("ID") not in existing_game_ids])
+        existing_game_ids.update(game_ids)
+        self.live_count_label.setText(f"Unique Games Added: {len(existing_game_ids)}")
+        self.set_buttons_enabled(True)
+        QMessageBox.information(self, "Session Resumed",
+                                f"Restored {len(search_keys)} searches and {len(games)} games.")
+
     def back_to_main(self):
-        # Clear previous searches and history when returning to main
+        # Clear previous searches and history when returning to main.
+        # The session itself stays on disk and can be resumed later.
         global searched_titles, existing_game_ids
         searched_titles.clear()
         existing_game_ids.clear()
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+        self.cover_loader.shutdown()
 
         from main import MainWindow
         global main_window
@@ -17,6 +17,7 @@ from PyQt5.QtGui import QPixmap, QIcon
 from PyQt5.QtCore import QTimer, Qt
 
 # Import the other modules to load faster
+import api
 import game_search
 import random_game_search
 
@@ -90,6 +91,12 @@ class MainWindow(QMainWindow):
         
         layout.addLayout(button_layout)
 
+        # Show when requests go through a shared search service (IGDB_SERVICE_URL)
+        if api.SERVICE_URL:
+            service_label = QLabel(f"Using shared search service at {api.SERVICE_URL}", self)
+            service_label.setAlignment(Qt.AlignCenter)
+            layout.addWidget(service_label)
+
     def launch_search(self):
         from game_search import GameSearchWindow
         global main_window
@@ -0,0 +1,185 @@
+# This file is the processing module for the IGDB Game Searcher application.
+# It turns pages of raw IGDB game data into the rows shown and saved by the
+# search window, using column-wise pandas operations instead of a Python
+# loop per game.
+
+# Author: Nelson McFadyen
+# Last Updated: October 18, 2026
+
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import api
+
+# Raw IGDB fields used when building result rows.
+RAW_COLUMNS = ["id", "name", "first_release_date", "rating", "genres",
+               "storyline", "summary", "platforms", "cover"]
+
+# Query fields that provide RAW_COLUMNS, with the cover expanded.
+SEARCH_FIELDS = "name, first_release_date, rating, genres, storyline, summary, platforms, cover.image_id, id"
+
+# Fields for random games, with names and the cover expanded (see game_to_record).
+RANDOM_GAME_FIELDS = (
+    "name, summary, release_dates.date, genres.name, "
+    "platforms.name, cover.id, cover.image_id, slug"
+)
+
+# Column order of the finished result rows (matches the Excel export).
+RESULT_COLUMNS = ["ID", "Name", "Release Date", "Rating", "Genres",
+                  "Storyline", "Summary", "Platforms", "Cover URL"]
+
+
+def games_to_frame(games):
+    """
+    Build a columnar frame from a page of raw IGDB games. Missing fields
+    become NaN, and genres/platforms are always lists.
+    """
+    frame = pd.DataFrame.from_records(games, columns=RAW_COLUMNS)
+    for column in ("genres", "platforms"):
+        frame[column] = [value if isinstance(value, list) else [] for value in frame[column]]
+    return frame
+
+
+def filter_by_genres(frame, genre_ids):
+    """Keep rows that have at least one of genre_ids (all rows if none given)."""
+    if not genre_ids or frame.empty:
+        return frame
+    exploded = frame["genres"].explode()
+    matches = exploded.isin(list(genre_ids)).groupby(level=0).any()
+    return frame[matches.reindex(frame.index, fill_value=False)]
+
+
+def drop_seen(frame, seen_ids):
+    """Drop rows whose id was already seen, and duplicate ids within the frame."""
+    if frame.empty:
+        return frame
+    frame = frame[~frame["id"].isin(seen_ids)]
+    return frame.drop_duplicates(subset="id")
+
+
+def join_names(id_lists, name_map, unknown_prefix):
+    """
+    Map lists of ids to comma-joined names, like api.fetch_genre_names /
+    fetch_platform_names followed by ', '.join, for a whole column at once.
+
+    Rows are dictionary-encoded by their id combination first, so names are
+    only joined once per distinct combination rather than once per game.
+    """
+    codes, combos = pd.factorize(id_lists.map(tuple))
+    joined = [
+        ", ".join(name_map.get(item_id, f"{unknown_prefix}{item_id}") for item_id in combo)
+        if combo else "Not Available"
+        for combo in combos
+    ]
+    return pd.Series(np.array(joined, dtype=object)[codes], index=id_lists.index)
+
+
+def format_dates(timestamps):
+    """
+    Vectorized api.format_unix_timestamp. Dates are formatted once per
+    distinct day and then broadcast back to the rows.
+    """
+    timestamps = pd.to_numeric(timestamps, errors="coerce")
+    missing = timestamps.isna() | (timestamps == 0)
+    days = (timestamps.where(~missing, 0) // 86400).astype("int64")
+    codes, unique_days = pd.factorize(days)
+    formatted = pd.to_datetime(unique_days * 86400, unit="s", utc=True).strftime("%d-%m-%Y")
+    dates = pd.Series(np.asarray(formatted, dtype=object)[codes], index=timestamps.index)
+    return dates.where(~missing, "Not Available")
+
+
+def cover_urls(covers):
+    """
+    Cover URLs for a column holding either expanded covers ({"image_id": ...})
+    or bare cover ids. Bare ids are resolved with one batched /covers request.
+    """
+    # Checked per value: a page where no game has a cover is all-NaN float,
+    # and one with only bare ids is int, so .str can't be used here.
+    image_ids = covers.map(lambda cover: cover.get("image_id") if isinstance(cover, dict) else None)
+    has_image = image_ids.map(lambda image_id: isinstance(image_id, str) and image_id != "")
+    prefix, suffix = api.COVER_IMAGE_URL.split("{}")
+    urls = pd.Series("No cover available", index=covers.index, dtype=object)
+    urls[has_image] = prefix + image_ids[has_image].astype(str) + suffix
+
+    is_bare_id = covers.map(lambda cover: isinstance(cover, (int, np.integer))
+                            or (isinstance(cover, float) and cover == cover and cover.is_integer()))
+    bare_ids = covers[is_bare_id].astype("int64")
+    if not bare_ids.empty:
+        url_map = api.fetch_cover_urls(bare_ids.unique().tolist())
+        urls.loc[bare_ids.index] = bare_ids.map(url_map).fillna("Cover image not found")
+    return urls
+
+
+def fill_missing(column):
+    return column.astype(object).where(column.notna(), "Not Available")
+
+
+def build_result_frame(frame, genre_map, platform_map):
+    """Turn a raw frame into result rows with display-ready columns."""
+    if frame.empty:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return pd.DataFrame({
+        "ID": frame["id"],
+        "Name": fill_missing(frame["name"]),
+        "Release Date": format_dates(frame["first_release_date"]),
+        "Rating": fill_missing(frame["rating"]),
+        "Genres": join_names(frame["genres"], genre_map, "Unknown Genre "),
+        "Storyline": fill_missing(frame["storyline"]),
+        "Summary": fill_missing(frame["summary"]),
+        "Platforms": join_names(frame["platforms"], platform_map, "Unknown Platform "),
+        "Cover URL": cover_urls(frame["cover"]),
+    }, columns=RESULT_COLUMNS)
+
+
+def read_game_ids(path):
+    """
+    Read IGDB game ids from a file: an Excel/CSV export with an "ID" column
+    (as saved by this app), or any text with ids separated by commas,
+    whitespace or new lines. Duplicates are dropped, keeping the first.
+    """
+    lower_path = path.lower()
+    if lower_path.endswith((".xlsx", ".xls", ".csv")):
+        read = pd.read_excel if lower_path.endswith((".xlsx", ".xls")) else pd.read_csv
+        frame = read(path)
+        id_column = next((column for column in ("ID", "id") if column in frame.columns), None)
+        if id_column is not None:
+            ids = pd.to_numeric(frame[id_column], errors="coerce").dropna().astype("int64").tolist()
+        else:
+            # No header row: every cell that is a whole number is an id.
+            cells = read(path, header=None).to_numpy().ravel()
+            ids = [int(float(cell)) for cell in cells if re.fullmatch(r"\d+(\.0)?", str(cell).strip())]
+    else:
+        with open(path, encoding="utf-8") as f:
+            ids = [int(token) for token in re.findall(r"\d+", f.read())]
+    return list(dict.fromkeys(ids))
+
+
+def format_release_dates(game_data):
+    release_dates = game_data.get("release_dates", [])
+    dates_formatted = []
+    for date_entry in release_dates:
+        if "date" in date_entry:
+            dt = datetime.fromtimestamp(date_entry["date"], tz=timezone.utc)
+            dates_formatted.append(dt.strftime("%d-%m-%Y"))
+    return ", ".join(dates_formatted) if dates_formatted else "No Information"
+
+
+def game_to_record(game_data):
+    """Flatten a drawn game into a row for the Excel export."""
+    platforms = game_data.get("platforms", [])
+    genres = game_data.get("genres", [])
+    cover = game_data.get("cover") or {}
+    slug = game_data.get("slug")
+    return {
+        "ID": game_data.get("id"),
+        "Name": game_data.get("name", "No Information"),
+        "Summary": game_data.get("summary", "No Information"),
+        "Platforms": ", ".join(p.get("name", "") for p in platforms) if platforms else "No Information",
+        "Genres": ", ".join(g.get("name", "") for g in genres) if genres else "No Information",
+        "Release Dates": format_release_dates(game_data),
+        "Cover URL": api.cover_image_url(cover.get("image_id")),
+        "Game URL": f"https://www.igdb.com/games/{slug}" if slug else "Not Available",
+    }
@@ -0,0 +1,163 @@
+# This file is the profiling module for the IGDB Game Searcher application.
+# When profiling is on, each searched / fetched / saved operation writes a
+# cProfile stats file and a wall-clock span timeline to a profile directory,
+# so slow cases can be compared afterwards.
+#
+# Turn it on with the IGDB_PROFILE_DIR environment variable, or from the
+# Tools menu of the search windows.
+
+# Author: Nelson McFadyen
+# Last Updated: October 18, 2026
+
+import os
+import json
+import time
+import cProfile
+import itertools
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+DEFAULT_PROFILE_DIR = os.path.join(os.path.expanduser('~'), '.igdb_game_searcher', 'profiles')
+
+# Directory profiles are written to; None means profiling is off.
+profile_dir = os.getenv('IGDB_PROFILE_DIR') or None
+
+_local = threading.local()
+_counter = itertools.count(1)
+
+
+def is_enabled():
+    return profile_dir is not None
+
+
+def set_enabled(enabled, directory=None):
+    global profile_dir
+    profile_dir = (directory or os.getenv('IGDB_PROFILE_DIR') or DEFAULT_PROFILE_DIR) if enabled else None
+
+
+class Operation:
+    """One profiled operation: its annotations and the spans recorded under it."""
+
+    def __init__(self, name, annotations):
+        self.name = name
+        self.annotations = dict(annotations)
+        self.start = time.perf_counter()
+        self.spans = []
+
+    def annotate(self, **annotations):
+        self.annotations.update(annotations)
+
+    def add_span(self, name, start, end, attributes):
+        # list.append is atomic, so worker threads can record spans directly.
+        self.spans.append({
+            "name": name,
+            "thread": threading.current_thread().name,
+            "start_ms": round((start - self.start) * 1000, 3),
+            "duration_ms": round((end - start) * 1000, 3),
+            **attributes,
+        })
+
+
+class _NullOperation:
+    """Stand-in used when profiling is off, so callers never need to check."""
+
+    def annotate(self, **annotations):
+        pass
+
+
+_NULL_OPERATION = _NullOperation()
+
+
+def current_operation():
+    return getattr(_local, 'operation', None)
+
+
+@contextmanager
+def profile_operation(name, **annotations):
+    """
+    Profile everything done inside the block as one operation. Yields the
+    Operation so more annotations (page count, row count...) can be added.
+    Nested operations on the same thread are recorded as spans of the outer one.
+    """
+    if profile_dir is None:
+        yield _NULL_OPERATION
+        return
+    outer = current_operation()
+    if outer is not None:
+        with span(name, **annotations):
+            yield outer
+        return
+
+    directory = profile_dir
+    operation = Operation(name, annotations)
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already running (e.g. an operation on another
+        # thread on Python 3.12+); keep the timeline only.
+        profiler = None
+    _local.operation = operation
+    try:
+        yield operation
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        _local.operation = None
+        _write_profile(directory, operation, profiler)
+
+
+@contextmanager
+def span(name, **attributes):
+    """Record the wall-clock time of the block in the current operation, if any."""
+    operation = current_operation()
+    if operation is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        operation.add_span(name, start, time.perf_counter(), attributes)
+
+
+def bind(function):
+    """
+    Wrap function so that, when run on another thread (e.g. a prefetch pool),
+    its spans are recorded under the operation active where bind was called.
+    """
+    operation = current_operation()
+    if operation is None:
+        return function
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        previous = current_operation()
+        _local.operation = operation
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _local.operation = previous
+    return wrapper
+
+
+def _write_profile(directory, operation, profiler):
+    try:
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(
+            directory,
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{next(_counter):04d}-{operation.name}"
+        )
+        if profiler is not None:
+            profiler.dump_stats(base + '.prof')
+        timeline = {
+            "operation": operation.name,
+            "annotations": operation.annotations,
+            "total_ms": round((time.perf_counter() - operation.start) * 1000, 3),
+            "spans": sorted(operation.spans, key=lambda entry: entry["start_ms"]),
+        }
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump(timeline, f, indent=2, default=str)
+    except OSError as e:
+        print(f"Could not write profile: {e}")
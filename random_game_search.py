@@ -5,19 +5,64 @@
 # Last Updated: March, 29, 2025
 
 import sys
-import random
 import requests
-from datetime import datetime, timezone
+import pandas as pd
 import qdarkstyle
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QTextEdit, QPushButton,
-    QGridLayout, QVBoxLayout, QHBoxLayout, QSizePolicy
+    QGridLayout, QVBoxLayout, QHBoxLayout, QSizePolicy, QComboBox, QSpinBox,
+    QMessageBox, QFileDialog, QCheckBox
 )
 from PyQt5.QtGui import QFont, QPixmap, QImage, QPainter, QPen
 from PyQt5.QtCore import Qt, QRunnable, QThreadPool, QObject, pyqtSignal, pyqtSlot
 
 import api  # All API logic is centralized in api.py
+import catalog_snapshot
+import processing
+import profiling
+
+
+# Batches of snapshot candidates probed for the platform filter, at most.
+MAX_PLATFORM_PROBES = 20
+
+
+def draw_games(count, genre_id=None, platform_id=None, year_range=None, min_rating=None, snapshot=None):
+    """
+    Draw up to count random games. With a catalog snapshot the ids are picked
+    locally from the snapshot rows matching the genre/year/rating filters;
+    otherwise IGDB is sampled directly.
+    """
+    if snapshot is None:
+        return api.draw_random_games(count, processing.RANDOM_GAME_FIELDS, genre_id, platform_id,
+                                     year_range=year_range, min_rating=min_rating)
+    filters = {
+        'genre_ids': [genre_id] if genre_id is not None else None,
+        'year_range': year_range,
+        'min_rating': min_rating,
+    }
+    if platform_id is None:
+        with profiling.span("snapshot.pick", rows=len(snapshot)):
+            game_ids = snapshot.random_ids(count, **filters)
+    else:
+        # The snapshot has no platforms, so shuffled candidates are probed
+        # (ids only) 500 at a time until enough of them are on the platform.
+        with profiling.span("snapshot.pick", rows=len(snapshot)):
+            candidates = snapshot.random_ids(500 * MAX_PLATFORM_PROBES, **filters)
+        game_ids = []
+        for start in range(0, len(candidates), 500):
+            batch = candidates[start:start + 500]
+            hits = {game['id'] for game in api.fetch_games_by_ids(
+                batch, "id", f"platforms = ({platform_id})", cacheable=False)}
+            game_ids.extend(game_id for game_id in batch if game_id in hits)
+            if len(game_ids) >= count:
+                break
+        game_ids = game_ids[:count]
+
+    games_by_id = {game['id']: game for game in api.fetch_games_by_ids(
+        game_ids, processing.RANDOM_GAME_FIELDS, cacheable=False)}
+    return [games_by_id[game_id] for game_id in game_ids if game_id in games_by_id]
+
 
 #########################################
 # Worker Signals for QRunnable          #
@@ -27,48 +72,59 @@ class WorkerSignals(QObject):
     finished = pyqtSignal(dict, object, QPixmap)  # game_data, game_url, pixmap
     error = pyqtSignal(str)
 
+
+class DrawSignals(QObject):
+    finished = pyqtSignal(list)  # list of drawn game_data dicts
+    error = pyqtSignal(str)
+
+
 #########################################
 # Worker Class Using QRunnable          #
 #########################################
 
 class FetchWorkerRunnable(QRunnable):
-    def __init__(self, desired_width, desired_height):
+    def __init__(self, desired_width, desired_height, filters=None, game_data=None):
         super().__init__()
         self.desired_width = desired_width
         self.desired_height = desired_height
+        # Keyword arguments for draw_games (genre, platform, years, rating, snapshot)
+        self.filters = filters or {}
+        # When game_data is given (e.g. from a bulk draw) only the cover is fetched.
+        self.game_data = game_data
         self.signals = WorkerSignals()
 
     @pyqtSlot()
     def run(self):
+        with profiling.profile_operation("random_fetch", genre_id=self.filters.get('genre_id'),
+                                         platform_id=self.filters.get('platform_id'),
+                                         from_snapshot=self.filters.get('snapshot') is not None,
+                                         from_queue=self.game_data is not None) as operation:
+            self.fetch(operation)
+
+    def fetch(self, operation):
         try:
-            # Get total games count using the helper in api.py.
-            total_games = api.get_games_count()
-            if total_games == 0:
-                raise Exception("No games found in the database.")
-            random_offset = random.randint(0, total_games - 1)
-            query = (
-                "fields name, summary, release_dates.date, genres.name, "
-                "platforms.name, cover.id, cover.image_id, slug; "
-                f"offset {random_offset}; limit 1;"
-            )
-            game_data_list = api.get_game_data(query)
-            if not game_data_list:
-                raise Exception("API call for game data returned no results.")
-            game_data = game_data_list[0]
+            game_data = self.game_data
+            if game_data is None:
+                game_data_list = draw_games(1, **self.filters)
+                if not game_data_list:
+                    raise Exception("API call for game data returned no results.")
+                game_data = game_data_list[0]
+            operation.annotate(game_id=game_data.get('id'), rows=1)
             # Build game URL from slug
             game_slug = game_data.get('slug')
             game_url = f"https://www.igdb.com/games/{game_slug}" if game_slug else None
 
-            # Process cover image using our api helper.
-            # Pass the numeric cover ID instead of the entire cover dictionary.
+            # The cover's image_id is already expanded in the query, so the
+            # URL can be built without another API request.
             cover = game_data.get('cover')
             if cover:
-                image_url = api.fetch_cover_image(cover.get("id"))
+                image_url = api.cover_image_url(cover.get("image_id"))
             else:
                 image_url = ""
 
             if image_url and image_url.startswith("http"):
-                image_response = requests.get(image_url, timeout=10)
+                with profiling.span("cover.download", url=image_url):
+                    image_response = requests.get(image_url, timeout=10)
                 if image_response.status_code == 200:
                     image = QImage()
                     image.loadFromData(image_response.content)
@@ -99,6 +155,33 @@ class FetchWorkerRunnable(QRunnable):
         painter.end()
         return QPixmap.fromImage(image)
 
+
+class DrawWorkerRunnable(QRunnable):
+    """Draws many random games at once for the queue / export."""
+    def __init__(self, count, filters=None):
+        super().__init__()
+        self.count = count
+        self.filters = filters or {}
+        self.signals = DrawSignals()
+
+    @pyqtSlot()
+    def run(self):
+        with profiling.profile_operation("random_draw", count=self.count,
+                                         genre_id=self.filters.get('genre_id'),
+                                         platform_id=self.filters.get('platform_id'),
+                                         from_snapshot=self.filters.get('snapshot') is not None) as operation:
+            try:
+                games = draw_games(self.count, **self.filters)
+                if not games:
+                    raise Exception("No games matched the selected filters.")
+            except Exception as e:
+                operation.annotate(error=str(e))
+                self.signals.error.emit(str(e))
+                games = []
+            operation.annotate(rows=len(games))
+            self.signals.finished.emit(games)
+
+
 ############################################
 # Main Window: Random Game Search Interface#
 ############################################
@@ -108,6 +191,13 @@ class RandomGameSearchWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("IGDB Game Searcher")
         self.resize(800, 400)
+
+        # Tools menu: profiling can also be switched on with IGDB_PROFILE_DIR
+        tools_menu = self.menuBar().addMenu("Tools")
+        self.profiling_action = tools_menu.addAction("Profile Random Fetches")
+        self.profiling_action.setCheckable(True)
+        self.profiling_action.setChecked(profiling.is_enabled())
+        self.profiling_action.toggled.connect(profiling.set_enabled)
         
         # Set up central widget and main layout
         central_widget = QWidget(self)
@@ -121,6 +211,45 @@ class RandomGameSearchWindow(QMainWindow):
         title_label.setObjectName("title_label")
         main_layout.addWidget(title_label)
         
+        # Filter row: optional genre / platform restriction for random draws
+        filter_layout = QHBoxLayout()
+        filter_layout.setSpacing(10)
+        filter_layout.addWidget(QLabel("Genre:", self))
+        self.genre_combo = QComboBox(self)
+        self.genre_combo.addItem("Any", None)
+        for genre_id, name in sorted(api.GENRE_MAP.items(), key=lambda item: item[1]):
+            self.genre_combo.addItem(name, genre_id)
+        filter_layout.addWidget(self.genre_combo)
+        filter_layout.addWidget(QLabel("Platform:", self))
+        self.platform_combo = QComboBox(self)
+        self.platform_combo.addItem("Any", None)
+        for platform_id, name in sorted(api.PLATFORM_MAP.items(), key=lambda item: item[1]):
+            self.platform_combo.addItem(name, platform_id)
+        filter_layout.addWidget(self.platform_combo)
+        # Release year range and minimum rating; the lowest value means "Any".
+        filter_layout.addWidget(QLabel("Released:", self))
+        self.year_from_spin = QSpinBox(self)
+        self.year_to_spin = QSpinBox(self)
+        for spin in (self.year_from_spin, self.year_to_spin):
+            spin.setRange(1949, 2100)
+            spin.setSpecialValueText("Any")
+            filter_layout.addWidget(spin)
+        filter_layout.addWidget(QLabel("Min Rating:", self))
+        self.min_rating_spin = QSpinBox(self)
+        self.min_rating_spin.setRange(0, 100)
+        self.min_rating_spin.setSpecialValueText("Any")
+        filter_layout.addWidget(self.min_rating_spin)
+        filter_layout.addStretch()
+        main_layout.addLayout(filter_layout)
+
+        # Pick from the local catalog snapshot (saved from the search page)
+        # instead of sampling IGDB, when one exists.
+        self.snapshot = catalog_snapshot.CatalogSnapshot.open()
+        snapshot_size = len(self.snapshot) if self.snapshot is not None else 0
+        self.snapshot_checkbox = QCheckBox(f"Pick from local catalog snapshot ({snapshot_size} games)", self)
+        self.snapshot_checkbox.setEnabled(snapshot_size > 0)
+        main_layout.addWidget(self.snapshot_checkbox)
+
         # Horizontal layout: left (game details) and right (image/link)
         content_layout = QHBoxLayout()
         main_layout.addLayout(content_layout)
@@ -176,6 +305,21 @@ class RandomGameSearchWindow(QMainWindow):
         self.fetch_button = QPushButton("Fetch Random Game", self)
         self.fetch_button.clicked.connect(self.fetch_random_game)
         button_layout.addWidget(self.fetch_button)
+
+        # Bulk draw: fetch N random games in as few requests as possible.
+        # "Fetch Random Game" then steps through them without new queries.
+        self.draw_count_spin = QSpinBox(self)
+        self.draw_count_spin.setRange(1, 5000)
+        self.draw_count_spin.setValue(50)
+        button_layout.addWidget(self.draw_count_spin)
+
+        self.draw_button = QPushButton("Draw Games", self)
+        self.draw_button.clicked.connect(self.draw_random_games)
+        button_layout.addWidget(self.draw_button)
+
+        self.save_button = QPushButton("Save Drawn to Excel", self)
+        self.save_button.clicked.connect(self.on_save)
+        button_layout.addWidget(self.save_button)
         
         self.back_button = QPushButton("Back to Main Page", self)
         self.back_button.clicked.connect(self.back_to_main)
@@ -183,19 +327,52 @@ class RandomGameSearchWindow(QMainWindow):
         
         main_layout.addLayout(button_layout)
 
+        self.queue_label = QLabel("Drawn games queued: 0", self)
+        main_layout.addWidget(self.queue_label)
+
+        # Games from the last bulk draw: all of them for export, and the ones
+        # not shown yet for the next "Fetch Random Game" click.
+        self.drawn_games = []
+        self.drawn_queue = []
+
         # Create a thread pool for QRunnable workers
         self.threadpool = QThreadPool()
+
+    def set_buttons_enabled(self, enabled):
+        self.fetch_button.setEnabled(enabled)
+        self.draw_button.setEnabled(enabled)
+        self.save_button.setEnabled(enabled)
+        self.back_button.setEnabled(enabled)
+
+    def current_filters(self):
+        year_range = tuple(spin.value() if spin.value() != spin.minimum() else None
+                           for spin in (self.year_from_spin, self.year_to_spin))
+        min_rating = self.min_rating_spin.value() or None
+        return {
+            'genre_id': self.genre_combo.currentData(),
+            'platform_id': self.platform_combo.currentData(),
+            'year_range': year_range,
+            'min_rating': min_rating,
+            'snapshot': self.snapshot if self.snapshot_checkbox.isChecked() else None,
+        }
     
     def fetch_random_game(self):
         # Disable buttons while fetching
-        self.fetch_button.setEnabled(False)
-        self.back_button.setEnabled(False)
+        self.set_buttons_enabled(False)
 
         desired_width = self.game_image_label.width()
         desired_height = self.game_image_label.height()
 
+        # Serve from the bulk-draw queue first; only query IGDB when it's empty.
+        game_data = self.drawn_queue.pop(0) if self.drawn_queue else None
+        self.queue_label.setText(f"Drawn games queued: {len(self.drawn_queue)}")
+
         # Create a QRunnable worker for fetching game data
-        runnable = FetchWorkerRunnable(desired_width, desired_height)
+        runnable = FetchWorkerRunnable(
+            desired_width, desired_height,
+            filters=self.current_filters(),
+            game_data=game_data
+        )
         runnable.signals.finished.connect(self.on_fetch_finished)
         runnable.signals.error.connect(self.on_fetch_error)
         
@@ -210,13 +387,45 @@ class RandomGameSearchWindow(QMainWindow):
                 self.game_link_label.setText(f'<a href="{game_url}">View Game on IGDB</a>')
             else:
                 self.game_link_label.setText("No link available")
-        self.fetch_button.setEnabled(True)
-        self.back_button.setEnabled(True)
+        self.set_buttons_enabled(True)
     
     def on_fetch_error(self, error_message):
         print("Error during fetch:", error_message)
-        self.fetch_button.setEnabled(True)
-        self.back_button.setEnabled(True)
+        self.set_buttons_enabled(True)
+
+    def draw_random_games(self):
+        self.set_buttons_enabled(False)
+        runnable = DrawWorkerRunnable(
+            self.draw_count_spin.value(),
+            filters=self.current_filters()
+        )
+        runnable.signals.finished.connect(self.on_draw_finished)
+        runnable.signals.error.connect(self.on_fetch_error)
+        self.threadpool.start(runnable)
+
+    def on_draw_finished(self, games):
+        if games:
+            self.drawn_games = games
+            self.drawn_queue = list(games)
+            self.queue_label.setText(f"Drawn games queued: {len(self.drawn_queue)}")
+            # Show the first drawn game straight away.
+            self.fetch_random_game()
+        else:
+            self.set_buttons_enabled(True)
+
+    def on_save(self):
+        if not self.drawn_games:
+            QMessageBox.warning(self, "No Data", "There are no drawn games to save.")
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save File", "", "Excel Files (*.xlsx);;All Files (*)")
+        if file_path:
+            try:
+                with profiling.profile_operation("save_excel", path=file_path, rows=len(self.drawn_games)):
+                    df = pd.DataFrame([processing.game_to_record(game) for game in self.drawn_games])
+                    df.to_excel(file_path, index=False)
+                QMessageBox.information(self, "Success", f"File saved successfully to {file_path}")
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"An error occurred while saving: {str(e)}")
     
     def populate_game_details(self, game_data):
         self.text_areas[0].setPlainText(game_data.get("name", "No Information"))
@@ -230,17 +439,7 @@ class RandomGameSearchWindow(QMainWindow):
         genres_str = ", ".join(genre.get("name", "") for genre in genres) if genres else "No Information"
         self.text_areas[3].setPlainText(genres_str)
         
-        release_dates = game_data.get("release_dates", [])
-        if release_dates:
-            dates_formatted = []
-            for date_entry in release_dates:
-                if "date" in date_entry:
-                    dt = datetime.fromtimestamp(date_entry["date"], tz=timezone.utc)
-                    dates_formatted.append(dt.strftime("%d-%m-%Y"))
-            release_dates_str = ", ".join(dates_formatted) if dates_formatted else "No Information"
-        else:
-            release_dates_str = "No Information"
-        self.text_areas[4].setPlainText(release_dates_str)
+        self.text_areas[4].setPlainText(processing.format_release_dates(game_data))
     
     def back_to_main(self):
         from main import MainWindow
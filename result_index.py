@@ -0,0 +1,138 @@
+# This file is the result_index module for the IGDB Game Searcher application.
+# It keeps secondary indexes over the search window's accumulated results
+# (rows of GameSearchWindow.games_list), updated as each search finishes, so
+# the results table can be re-sorted and re-filtered without rescanning
+# every record or calling the API.
+
+# Author: Nelson McFadyen
+# Last Updated: October 18, 2026
+
+import numpy as np
+
+SORT_ORDER_ADDED = "order_added"
+SORT_RATING = "rating"
+SORT_RELEASE_DATE = "release_date"
+
+
+def rating_key(game):
+    rating = game.get("Rating")
+    if isinstance(rating, (int, float)) and rating == rating:  # skips NaN
+        return float(rating)
+    return None
+
+
+def date_key(game):
+    """Release date "dd-mm-YYYY" as a sortable YYYYMMDD number, or None."""
+    date = game.get("Release Date")
+    if isinstance(date, str) and len(date) == 10 and date[2] == "-" and date[5] == "-":
+        try:
+            return int(date[6:] + date[3:5] + date[:2])
+        except ValueError:
+            return None
+    return None
+
+
+def split_names(value):
+    if not isinstance(value, str) or value in ("Not Available", "No Information"):
+        return []
+    return [name for name in value.split(", ") if name]
+
+
+class SortedColumn:
+    """Keys kept sorted alongside their row numbers, for bisect range queries."""
+
+    def __init__(self):
+        self.keys = np.zeros(0, dtype="float64")
+        self.rows = np.zeros(0, dtype="int64")
+
+    def add(self, keys, rows):
+        if not keys:
+            return
+        keys = np.asarray(keys, dtype="float64")
+        rows = np.asarray(rows, dtype="int64")
+        order = np.argsort(keys, kind="stable")
+        keys, rows = keys[order], rows[order]
+        # Merge the sorted batch in; rows added later sort after equal keys.
+        positions = np.searchsorted(self.keys, keys, side="right")
+        self.keys = np.insert(self.keys, positions, keys)
+        self.rows = np.insert(self.rows, positions, rows)
+
+    def range_rows(self, low=None, high=None):
+        """Rows with low <= key < high (either bound may be None), in key order."""
+        start = 0 if low is None else np.searchsorted(self.keys, low, side="left")
+        end = len(self.keys) if high is None else np.searchsorted(self.keys, high, side="left")
+        return self.rows[start:end]
+
+
+class ResultIndex:
+    """
+    Indexes over result records:
+
+    - ratings and release dates: SortedColumn, for range filters and sorting
+    - genres and platforms: inverted index of name -> row numbers
+
+    Rows are positions in the indexed list, which is only ever appended to.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.ratings = SortedColumn()
+        self.release_dates = SortedColumn()
+        self.genres = {}     # genre name -> set of rows
+        self.platforms = {}  # platform name -> set of rows
+
+    def add(self, games):
+        """Index games appended after the rows already indexed."""
+        rating_keys, rating_rows, date_keys, date_rows = [], [], [], []
+        for row, game in enumerate(games, start=self.count):
+            rating = rating_key(game)
+            if rating is not None:
+                rating_keys.append(rating)
+                rating_rows.append(row)
+            date = date_key(game)
+            if date is not None:
+                date_keys.append(date)
+                date_rows.append(row)
+            for name in split_names(game.get("Genres")):
+                self.genres.setdefault(name, set()).add(row)
+            for name in split_names(game.get("Platforms")):
+                self.platforms.setdefault(name, set()).add(row)
+        self.ratings.add(rating_keys, rating_rows)
+        self.release_dates.add(date_keys, date_rows)
+        self.count += len(games)
+
+    def select(self, min_rating=None, year_range=None, genre=None, platform=None,
+               sort_by=SORT_ORDER_ADDED, descending=False):
+        """
+        Rows matching every given filter, in the requested order. year_range
+        is an inclusive (first_year, last_year) tuple; either end may be None.
+        Rows without the sort key (no rating / date) come last.
+        """
+        keep = np.ones(self.count, dtype=bool)
+        if min_rating is not None:
+            keep &= self.mask(self.ratings.range_rows(low=min_rating))
+        first_year, last_year = year_range or (None, None)
+        if first_year is not None or last_year is not None:
+            low = first_year * 10000 if first_year is not None else None
+            high = (last_year + 1) * 10000 if last_year is not None else None
+            keep &= self.mask(self.release_dates.range_rows(low, high))
+        if genre is not None:
+            keep &= self.mask(self.genres.get(genre, ()))
+        if platform is not None:
+            keep &= self.mask(self.platforms.get(platform, ()))
+
+        if sort_by == SORT_ORDER_ADDED:
+            rows = np.flatnonzero(keep)
+            return rows[::-1] if descending else rows
+        column = self.ratings if sort_by == SORT_RATING else self.release_dates
+        ordered = column.rows[::-1] if descending else column.rows
+        ordered = ordered[keep[ordered]]
+        without_key = keep.copy()
+        without_key[column.rows] = False
+        return np.concatenate([ordered, np.flatnonzero(without_key)])
+
+    def mask(self, rows):
+        mask = np.zeros(self.count, dtype=bool)
+        if len(rows):
+            mask[np.fromiter(rows, dtype="int64", count=len(rows))] = True
+        return mask
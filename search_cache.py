@@ -0,0 +1,88 @@
+# This file is the search_cache module for the IGDB Game Searcher application.
+# It keeps the unfiltered results of each title search so that later searches
+# for the same title with different genre checkboxes (which only narrow those
+# results down) can be answered locally instead of hitting IGDB again.
+
+# Author: Nelson McFadyen
+# Last Updated: October 18, 2026
+
+import threading
+from collections import OrderedDict
+
+PAGE_SIZE = 500
+
+
+class SearchCache:
+    """
+    Two levels of cached IGDB data:
+
+    - candidates: every raw game returned by the title search, before genre
+      filtering or dedupe, keyed by the (lowercased) title. Any genre
+      selection for that title is a subset of it.
+    - details: full game records by id, so the detail pass of a two-phase
+      search only requests ids it hasn't seen before.
+
+    Both are bounded and evict the least recently used entries first.
+    """
+
+    def __init__(self, max_titles=50, max_details=50000):
+        self.max_titles = max_titles
+        self.max_details = max_details
+        self._candidates = OrderedDict()  # title -> (games, has_full_fields)
+        self._details = OrderedDict()     # game id -> raw game
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.requests_avoided = 0
+
+    def get_candidates(self, title):
+        """
+        Returns (games, has_full_fields) for a cached title search, or None.
+        Counts as a lookup for the hit-rate statistics.
+        """
+        with self._lock:
+            self.lookups += 1
+            entry = self._candidates.get(title)
+            if entry is None:
+                return None
+            self._candidates.move_to_end(title)
+            self.hits += 1
+            # The search would have needed one request per page, plus the
+            # empty/short page that ends it.
+            self.requests_avoided += len(entry[0]) // PAGE_SIZE + 1
+            return entry
+
+    def put_candidates(self, title, games, has_full_fields):
+        with self._lock:
+            self._candidates[title] = (list(games), has_full_fields)
+            self._candidates.move_to_end(title)
+            while len(self._candidates) > self.max_titles:
+                self._candidates.popitem(last=False)
+
+    def get_details(self, game_ids):
+        """Returns (found, missing_ids): cached games by id and ids still to fetch."""
+        found, missing_ids = {}, []
+        with self._lock:
+            for game_id in game_ids:
+                game = self._details.get(game_id)
+                if game is None:
+                    missing_ids.append(game_id)
+                else:
+                    self._details.move_to_end(game_id)
+                    found[game_id] = game
+            if game_ids and not missing_ids:
+                self.requests_avoided += 1
+        return found, missing_ids
+
+    def put_details(self, games):
+        with self._lock:
+            for game in games:
+                if game.get('id') is not None:
+                    self._details[game['id']] = game
+                    self._details.move_to_end(game['id'])
+            while len(self._details) > self.max_details:
+                self._details.popitem(last=False)
+
+    def stats_text(self):
+        return (f"Searches answered from cache: {self.hits} of {self.lookups} "
+                f"({self.requests_avoided} requests avoided)")
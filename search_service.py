@@ -0,0 +1,223 @@
+# This file is the search_service module for the IGDB Game Searcher application.
+# It runs a small local HTTP service that holds one IGDB token, one response
+# cache, one rate limiter and one connection pool, so several copies of the
+# app (GUI or CLI, started with IGDB_SERVICE_URL pointing here) share them
+# instead of each competing for the same rate limit.
+#
+# Start it with:  python cli.py serve --port 8765
+#
+# Endpoints:
+#   POST /v4/<endpoint>          raw Apicalypse passthrough (what api.py clients use)
+#   GET  /search?title=...       all games matching a title
+#   GET  /random?count=N&genre=&platform=
+#   GET  /cover?id=...           cover URL for a cover id
+#   GET  /stats                  cache and request counters
+#
+# The service has no access control of its own beyond an optional shared
+# secret: set IGDB_SERVICE_TOKEN on the service and on every client, and
+# requests without it are refused. By default it only listens on 127.0.0.1;
+# it will not listen on any other address unless a token is set.
+
+# Author: Nelson McFadyen
+# Last Updated: October 18, 2026
+
+import hmac
+import json
+import time
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import api
+import processing
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+
+class ResponseCache:
+    """
+    Thread-safe TTL + LRU cache of (status, body) responses, bounded by the
+    total size of the cached bodies.
+
+    Concurrent requests for the same key are coalesced: the first one fetches
+    from IGDB and the others wait for its result instead of sending their own.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, status, body)
+        self._in_flight = {}           # key -> threading.Event
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_fetch(self, key, fetch):
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1], entry[2]
+                event = self._in_flight.get(key)
+                if event is None:
+                    event = self._in_flight[key] = threading.Event()
+                    self.misses += 1
+                    break
+                self.coalesced += 1
+            # Someone else is already fetching this key; wait and re-check.
+            event.wait()
+
+        try:
+            status, body = fetch()
+            if status == 200 and len(body) <= self.max_bytes:
+                with self._lock:
+                    old = self._entries.pop(key, None)
+                    if old is not None:
+                        self.total_bytes -= len(old[2])
+                    self._entries[key] = (time.monotonic() + self.ttl, status, body)
+                    self.total_bytes += len(body)
+                    while self.total_bytes > self.max_bytes:
+                        _, evicted = self._entries.popitem(last=False)
+                        self.total_bytes -= len(evicted[2])
+            return status, body
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            event.set()
+
+
+CACHE = ResponseCache()
+
+
+def forward(endpoint, body):
+    response = api.post_igdb(endpoint, body)
+    return response.status_code, response.content
+
+
+def json_response(data, status=200):
+    return status, json.dumps(data).encode('utf-8')
+
+
+# Fetches for the cached GET endpoints. A failed IGDB request comes back as
+# a 502 rather than a 200, so get_or_fetch never caches it.
+def search_games(title):
+    try:
+        games = list(api.iter_query(api.Query(processing.SEARCH_FIELDS).search(title)))
+    except api.IGDBRequestError as e:
+        return json_response({"error": str(e)}, 502)
+    return json_response(games)
+
+
+def cover_url(cover_id):
+    url = api.fetch_cover_image(cover_id)
+    if url == "Error fetching cover image":
+        return json_response({"error": url}, 502)
+    return json_response({"url": url})
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    def authorized(self):
+        """True if no token is configured or the request carries the right one."""
+        if not api.SERVICE_TOKEN:
+            return True
+        token = self.headers.get(api.SERVICE_TOKEN_HEADER) or ''
+        if hmac.compare_digest(token.encode('utf-8'), api.SERVICE_TOKEN.encode('utf-8')):
+            return True
+        self.send_error(401, "Missing or wrong service token")
+        return False
+
+    def do_POST(self):
+        if not self.authorized():
+            return
+        path = urlparse(self.path).path
+        if not path.startswith('/v4/'):
+            self.send_error(404)
+            return
+        endpoint = path[len('/v4/'):]
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8')
+        try:
+            if self.headers.get(api.NO_CACHE_HEADER):
+                # e.g. random id probes, which will never be asked for again
+                status, payload = forward(endpoint, body)
+            else:
+                status, payload = CACHE.get_or_fetch(('v4', endpoint, body), lambda: forward(endpoint, body))
+        except Exception as e:
+            self.send_error(502, str(e))
+            return
+        self.send_payload(status, payload)
+
+    def do_GET(self):
+        if not self.authorized():
+            return
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            if url.path == '/search' and params.get('title'):
+                title = params['title']
+                status, payload = CACHE.get_or_fetch(('search', title), lambda: search_games(title))
+            elif url.path == '/random':
+                # Random draws are never cached.
+                status, payload = json_response(api.draw_random_games(
+                    int(params.get('count', 1)), processing.RANDOM_GAME_FIELDS,
+                    int(params['genre']) if params.get('genre') else None,
+                    int(params['platform']) if params.get('platform') else None
+                ))
+            elif url.path == '/cover' and params.get('id'):
+                cover_id = int(params['id'])
+                status, payload = CACHE.get_or_fetch(('cover', cover_id), lambda: cover_url(cover_id))
+            elif url.path == '/stats':
+                status, payload = json_response({
+                    "cache_hits": CACHE.hits,
+                    "cache_misses": CACHE.misses,
+                    "coalesced_requests": CACHE.coalesced,
+                    "cached_entries": len(CACHE._entries),
+                    "cached_bytes": CACHE.total_bytes,
+                })
+            else:
+                self.send_error(404)
+                return
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        except Exception as e:
+            self.send_error(502, str(e))
+            return
+        self.send_payload(status, payload)
+
+    def send_payload(self, status, payload):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # Keep the console quiet; /stats has the numbers.
+        pass
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    if api.SERVICE_URL:
+        raise SystemExit("The shared service talks to IGDB directly; unset IGDB_SERVICE_URL to run it.")
+    if host not in LOOPBACK_HOSTS and not api.SERVICE_TOKEN:
+        # Anyone who can reach the port would get to use our IGDB token.
+        raise SystemExit(f"Set IGDB_SERVICE_TOKEN before listening on {host}; "
+                         "without it the service only listens on 127.0.0.1.")
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    print(f"IGDB search service listening on http://{host}:{port}")
+    print(f"Point clients at it with IGDB_SERVICE_URL=http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,97 @@
+# This file is the session_store module for the IGDB Game Searcher application.
+# It persists Filtered Game Search sessions (search history and fetched games)
+# to disk so they can be resumed and exported later without re-querying IGDB.
+
+# Author: Nelson McFadyen
+# Last Updated: October 18, 2026
+
+import os
+import json
+import time
+
+# Sessions are kept in the user's home folder unless IGDB_SESSION_DIR is set.
+SESSION_DIR = os.getenv(
+    'IGDB_SESSION_DIR',
+    os.path.join(os.path.expanduser('~'), '.igdb_game_searcher', 'sessions')
+)
+
+
+def latest_session_path(directory=SESSION_DIR):
+    """
+    Returns the path of the most recent session file, or None if there is none.
+    """
+    if not os.path.isdir(directory):
+        return None
+    names = [name for name in os.listdir(directory)
+             if name.startswith('session-') and name.endswith('.jsonl')]
+    if not names:
+        return None
+    # Names embed a sortable timestamp, so the last one is the newest.
+    return os.path.join(directory, max(names))
+
+
+class SessionStore:
+    """
+    Append-only store for one search session.
+
+    Every finished search is written as a single JSON line holding the search
+    key and the game records it added. Each line is flushed and fsync'd before
+    returning, so a crash can at worst lose the line being written; a partial
+    trailing line is ignored (and cut off) the next time the session is loaded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    @classmethod
+    def new_session(cls, directory=SESSION_DIR):
+        os.makedirs(directory, exist_ok=True)
+        name = time.strftime('session-%Y%m%d-%H%M%S.jsonl')
+        return cls(os.path.join(directory, name))
+
+    def append_search(self, search_key, games):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        line = json.dumps({"search_key": search_key, "games": games}, ensure_ascii=False)
+        self._file.write(line + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def load(self):
+        """
+        Read the session back. Returns (search_keys, games, game_ids) in the
+        order they were recorded.
+        """
+        search_keys, games, game_ids = [], [], set()
+        if not os.path.exists(self.path):
+            return search_keys, games, game_ids
+
+        good_size = 0
+        with open(self.path, 'rb') as f:
+            for raw_line in f:
+                try:
+                    if not raw_line.endswith(b'\n'):
+                        raise ValueError("incomplete line")
+                    entry = json.loads(raw_line)
+                except ValueError:
+                    # Interrupted write from a crash; everything after it is unusable.
+                    break
+                good_size += len(raw_line)
+                search_keys.append(entry.get("search_key", ""))
+                for game in entry.get("games", []):
+                    games.append(game)
+                    if game.get("ID") is not None:
+                        game_ids.add(game["ID"])
+
+        # Drop any torn tail so new appends start on a clean line.
+        if good_size < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_size)
+        return search_keys, games, game_ids
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None